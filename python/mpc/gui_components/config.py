@@ -17,6 +17,11 @@ DEFAULT_TC_ADDRESS = SERVER_TC_ADDRESS
 DEFAULT_FS740_ADDRESS = SERVER_FS740_ADDRESS
 DEFAULT_FS740_PORT = 5025
 
+# Peer connection startup (client side, non-blocking retries with backoff)
+# 8 attempts retry for ~6.4 s in total (the old blocking connect gave up after ~3 s)
+PEER_CONNECT_ATTEMPTS = 8
+PEER_CONNECT_BACKOFF_MS = 50  # Doubles after every failed attempt
+
 # Measurement defaults
 DEFAULT_ACQ_DURATION = 0.5
 DEFAULT_BIN_WIDTH = 100
@@ -78,6 +83,7 @@ CORRELATION_LABELS = [
 ]
 HISTOGRAM_COLORS = ['blue', 'green', 'red', 'yellow']
 HISTOGRAM_LABELS = ['1-3', '1-4', '2-3', '2-4']
+MAX_PLOT_POINTS = 2000  # Upper bound on points per plotted series (decimated above this)
 
 # Default device serials for local optimizer rows (serial, channel)
 DEFAULT_LOCAL_SERIALS = [
@@ -2,6 +2,7 @@
 
 import logging
 import base64
+import queue
 import threading
 from pathlib import Path
 from typing import Optional, Callable
@@ -11,9 +12,9 @@ logger = logging.getLogger(__name__)
 
 # File transfer settings
 CHUNK_SIZE = 64 * 1024  # 64 KB chunks — smaller to reduce per-message overhead after base64 + encryption
-CHUNK_DELAY_MS = 30  # Delay between chunks (ms) as baseline throttle
-ACK_BATCH_SIZE = 5  # Receiver sends ACK every N chunks; sender waits for it
-ACK_TIMEOUT_SEC = 60  # Seconds to wait for a chunk-batch ACK before aborting
+ACK_BATCH_SIZE = 5  # Receiver sends a cumulative ACK every N chunks (and on the last)
+WINDOW_CHUNKS = 16  # Sender keeps at most this many chunks un-ACKed in flight
+ACK_TIMEOUT_SEC = 60  # Seconds to wait for a chunk ACK before aborting
 
 
 class FileTransferManager:
@@ -39,10 +40,16 @@ class FileTransferManager:
         # Track incoming file chunks
         self.incoming_files = {}  # transfer_id -> {'filename', 'channel', 'total_chunks', 'chunks', 'size'}
         
-        # ACK-based flow control
-        self._chunk_ack_event = threading.Event()
+        # Sliding-window flow control: highest cumulative ACK for the file being sent
+        self._ack_cond = threading.Condition()
+        self._acked_chunks = 0
         self._send_thread: Optional[threading.Thread] = None
         
+        # Incoming-file work (chunk bookkeeping, assembly, disk writes) runs on
+        # one worker thread, in arrival order, off the network receiver thread
+        self._recv_queue: "queue.Queue" = queue.Queue()
+        self._recv_thread: Optional[threading.Thread] = None
+        
         logger.info(f"FileTransferManager initialized, remote dir: {self.remote_dir}")
     
     def update_status(self, text: str, color: str = 'black'):
@@ -53,6 +60,30 @@ class FileTransferManager:
             except Exception as e:
                 logger.error(f"Error updating status: {e}")
     
+    def queued(self, handler: Callable) -> Callable:
+        """Wrap a receive handler so it runs on the receive worker thread."""
+        def post(data: dict):
+            if self._recv_thread is None:
+                self._recv_thread = threading.Thread(
+                    target=self._recv_worker, daemon=True, name="file-transfer-receiver")
+                self._recv_thread.start()
+            self._recv_queue.put((handler, data))
+        return post
+    
+    def _recv_worker(self):
+        """Receive worker: run queued handlers until stop() posts the sentinel."""
+        while True:
+            item = self._recv_queue.get()
+            if item is None:
+                return
+            handler, data = item
+            handler(data)
+    
+    def stop(self):
+        """Stop the receive worker (pending work is dropped)."""
+        if self._recv_thread is not None:
+            self._recv_queue.put(None)
+    
     def request_remote_files(self):
         """Request timestamp files from remote peer."""
         if not self.peer_connection or not self.peer_connection.is_connected():
@@ -182,9 +213,16 @@ class FileTransferManager:
                 logger.error("Failed to send FILE_TRANSFER_START")
                 return False
             
-            # Send file in chunks with flow control
+            # Send file in chunks, keeping up to WINDOW_CHUNKS un-ACKed in flight
+            with self._ack_cond:
+                self._acked_chunks = 0
             with open(filepath, 'rb') as f:
                 for chunk_index in range(num_chunks):
+                    if not self._wait_for_ack(chunk_index + 1 - WINDOW_CHUNKS):
+                        logger.error(f"Timeout ({ACK_TIMEOUT_SEC}s) waiting for chunk ACK "
+                                     f"at chunk {chunk_index + 1}/{num_chunks}")
+                        return False
+                    
                     chunk_data = f.read(CHUNK_SIZE)
                     encoded_chunk = base64.b64encode(chunk_data).decode('ascii')
                     
@@ -199,24 +237,15 @@ class FileTransferManager:
                         logger.error(f"Failed to send chunk {chunk_index}/{num_chunks}")
                         return False
                     
-                    # Baseline delay between every chunk
-                    if CHUNK_DELAY_MS > 0:
-                        time.sleep(CHUNK_DELAY_MS / 1000.0)
-                    
-                    # ACK-based flow control: after every ACK_BATCH_SIZE chunks,
-                    # wait for the receiver to acknowledge before continuing.
-                    is_last = (chunk_index == num_chunks - 1)
-                    if (chunk_index + 1) % ACK_BATCH_SIZE == 0 or is_last:
-                        self._chunk_ack_event.clear()
-                        if not self._chunk_ack_event.wait(timeout=ACK_TIMEOUT_SEC):
-                            logger.error(f"Timeout ({ACK_TIMEOUT_SEC}s) waiting for chunk ACK "
-                                         f"at chunk {chunk_index + 1}/{num_chunks}")
-                            return False
-                    
                     # Log progress periodically
-                    if (chunk_index + 1) % 10 == 0 or is_last:
+                    if (chunk_index + 1) % 10 == 0 or chunk_index == num_chunks - 1:
                         logger.info(f"Progress: {chunk_index + 1}/{num_chunks} chunks sent")
             
+            # Everything must be ACKed before the end marker
+            if not self._wait_for_ack(num_chunks):
+                logger.error(f"Timeout ({ACK_TIMEOUT_SEC}s) waiting for final chunk ACK")
+                return False
+            
             # Send file end marker
             if not self.peer_connection.send_command('FILE_TRANSFER_END', {
                 'transfer_id': transfer_id
@@ -231,9 +260,17 @@ class FileTransferManager:
             logger.error(f"Error in _send_file_chunked: {e}")
             return False
     
+    def _wait_for_ack(self, count: int) -> bool:
+        """Block until at least count chunks are ACKed; False on timeout."""
+        with self._ack_cond:
+            return self._ack_cond.wait_for(lambda: self._acked_chunks >= count,
+                                           timeout=ACK_TIMEOUT_SEC)
+    
     def handle_chunk_ack(self, data: dict):
-        """Handle chunk ACK from receiver — unblocks the sender loop."""
-        self._chunk_ack_event.set()
+        """Handle cumulative chunk ACK from receiver — advances the send window."""
+        with self._ack_cond:
+            self._acked_chunks = max(self._acked_chunks, data.get('received', 0))
+            self._ack_cond.notify_all()
     
     def handle_transfer_start(self, data: dict):
         """Handle start of chunked file transfer."""
@@ -328,13 +365,10 @@ class FileTransferManager:
             # Ensure remote directory exists
             self.remote_dir.mkdir(parents=True, exist_ok=True)
             
-            # Assemble file from chunks (in background to avoid blocking)
+            # Assemble file from chunks
             logger.info(f"Assembling file {transfer['filename']} from {transfer['num_chunks']} chunks")
-            file_data = b''
-            for i in range(transfer['num_chunks']):
-                chunk_encoded = transfer['chunks'][i]
-                chunk_decoded = base64.b64decode(chunk_encoded)
-                file_data += chunk_decoded
+            file_data = b''.join(base64.b64decode(transfer['chunks'][i])
+                                 for i in range(transfer['num_chunks']))
             
             # Verify size
             if len(file_data) != transfer['size']:
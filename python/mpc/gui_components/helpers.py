@@ -1,5 +1,9 @@
 """Helper functions for GUI operations."""
 
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096, typed=True)
 def format_number(number: int) -> str:
     """Format a number with space as thousand separator."""
     return f"{number:,}".replace(",", " ")
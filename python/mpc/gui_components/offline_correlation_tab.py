@@ -360,7 +360,7 @@ class OfflineCorrelationTab:
         self.canvas = FigureCanvasTkAgg(self.fig, master=plot_frame)
         self.canvas.get_tk_widget().configure(background='#F5F5F5')
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        self.canvas.draw()
+        self.canvas.draw_idle()
     
     def _refresh_offset(self):
         """Refresh time offset from app config."""
@@ -435,18 +435,14 @@ class OfflineCorrelationTab:
         text_widget.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         def run_validation():
-            text_widget.insert(tk.END, "="*80 + "\n")
-            text_widget.insert(tk.END, "FILE VALIDATION REPORT\n")
-            text_widget.insert(tk.END, "="*80 + "\n\n")
+            text_widget.insert(tk.END, "="*80 + "\nFILE VALIDATION REPORT\n" + "="*80 + "\n\n")
             text_widget.update()
             
             all_valid = True
             validations = {}
             
             for side, ch, filepath in files_to_validate:
-                text_widget.insert(tk.END, f"\n{'='*80}\n")
-                text_widget.insert(tk.END, f"Validating {side} Ch{ch}: {filepath.name}\n")
-                text_widget.insert(tk.END, f"{'='*80}\n\n")
+                text_widget.insert(tk.END, f"\n{'='*80}\nValidating {side} Ch{ch}: {filepath.name}\n{'='*80}\n\n")
                 text_widget.update()
                 
                 try:
@@ -459,32 +455,31 @@ class OfflineCorrelationTab:
                         text_widget.insert(tk.END, "❌ File validation FAILED\n\n", 'error')
                         all_valid = False
                     
-                    # Print info
-                    text_widget.insert(tk.END, "📊 File Info:\n")
+                    # Print info (built up front, inserted with one Tk call)
+                    lines = ["📊 File Info:\n"]
                     for key, value in validation['info'].items():
                         if isinstance(value, float):
                             if 'sec' in key.lower() and value > 1:
-                                text_widget.insert(tk.END, f"  {key}: {value:.2f}\n")
+                                lines.append(f"  {key}: {value:.2f}\n")
                             elif 'hz' in key.lower():
-                                text_widget.insert(tk.END, f"  {key}: {value:.1f}\n")
+                                lines.append(f"  {key}: {value:.1f}\n")
                             else:
-                                text_widget.insert(tk.END, f"  {key}: {value:,.0f}\n")
+                                lines.append(f"  {key}: {value:,.0f}\n")
                         elif isinstance(value, int):
-                            text_widget.insert(tk.END, f"  {key}: {value:,}\n")
+                            lines.append(f"  {key}: {value:,}\n")
                         else:
-                            text_widget.insert(tk.END, f"  {key}: {value}\n")
+                            lines.append(f"  {key}: {value}\n")
+                    text_widget.insert(tk.END, "".join(lines))
                     
-                    # Print errors
+                    # Print errors (tagged header + bullet list in one insert)
                     if validation['errors']:
-                        text_widget.insert(tk.END, f"\n❌ Errors ({len(validation['errors'])}):\n", 'error')
-                        for err in validation['errors']:
-                            text_widget.insert(tk.END, f"  • {err}\n")
+                        text_widget.insert(tk.END, f"\n❌ Errors ({len(validation['errors'])}):\n", 'error',
+                                           "".join(f"  • {err}\n" for err in validation['errors']))
                     
                     # Print warnings
                     if validation['warnings']:
-                        text_widget.insert(tk.END, f"\n⚠️  Warnings ({len(validation['warnings'])}):\n", 'warning')
-                        for warn in validation['warnings']:
-                            text_widget.insert(tk.END, f"  • {warn}\n")
+                        text_widget.insert(tk.END, f"\n⚠️  Warnings ({len(validation['warnings'])}):\n", 'warning',
+                                           "".join(f"  • {warn}\n" for warn in validation['warnings']))
                     
                     text_widget.insert(tk.END, "\n")
                     text_widget.update()
@@ -494,9 +489,7 @@ class OfflineCorrelationTab:
                     all_valid = False
             
             # Summary
-            text_widget.insert(tk.END, f"\n{'='*80}\n")
-            text_widget.insert(tk.END, "SUMMARY\n")
-            text_widget.insert(tk.END, f"{'='*80}\n\n")
+            text_widget.insert(tk.END, f"\n{'='*80}\nSUMMARY\n{'='*80}\n\n")
             
             if all_valid:
                 text_widget.insert(tk.END, "✅ All files passed validation!\n", 'success')
@@ -990,7 +983,7 @@ class OfflineCorrelationTab:
         self.ax2.grid(True, alpha=0.3)
         
         self.fig.tight_layout()
-        self.canvas.draw()
+        self.canvas.draw_idle()
     
     def _export_results(self):
         """Export results to file."""
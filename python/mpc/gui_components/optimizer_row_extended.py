@@ -10,16 +10,35 @@ from device_hander import MPC320Controller, TimeController as TCWrapper
 from functions import optimize_paddles
 
 
+# Display columns shown in the shared Treeview (id, header, width in px)
+DISPLAY_COLUMNS = [
+    ("row", "#", 30),
+    ("start_angles", "Start [deg]", 120),
+    ("start_value", "Start Val", 80),
+    ("angles", "Angles [deg]", 120),
+    ("value", "Current Val", 80),
+    ("best_angles", "Best [deg]", 120),
+    ("best_value", "Best Val", 80),
+    ("status", "Status", 150),
+]
+
+
 class OptimizerRowExtended:
     """
     Extended optimizer row that can control both local and remote MPC320 devices.
     Remote control sends commands via PeerConnection.
+    
+    Input widgets (serial, channel, buttons) are gridded into ``frame``; the
+    read-only values live in one item of the shared ``tree`` so updates touch
+    a single Treeview cell instead of a dedicated Label per value.
     """
     
-    def __init__(self, frame, row_idx, tc_address, action_color, 
+    def __init__(self, frame, tree, row_idx, tc_address, action_color, 
                  is_remote: bool = False, peer_connection=None,
                  default_serial=None, default_channel=1):
         self.frame = frame
+        self.tree = tree
+        self.iid = str(row_idx)
         self.row_idx = row_idx
         self.tc_address = tc_address
         self.action_color = action_color
@@ -55,26 +74,11 @@ class OptimizerRowExtended:
         self.channel_box.set(default_channel)
         self.channel_box.grid(row=row, column=1)
         
-        # Display labels
-        self.start_angles_lbl = tk.Label(self.frame, text="- , - , -", width=16)
-        self.start_value_lbl = tk.Label(self.frame, text="-", width=10)
-        self.angles_lbl = tk.Label(self.frame, text="- , - , -", width=16)
-        self.value_lbl = tk.Label(self.frame, text="-", width=10)
-        self.best_angles_lbl = tk.Label(self.frame, text="- , - , -", width=16)
-        self.best_value_lbl = tk.Label(self.frame, text="-", width=10)
-        self.status_lbl = tk.Label(self.frame, text="Idle", width=18)
-        
-        # Remote indicator
-        if self.is_remote:
-            self.status_lbl.config(foreground='blue')
-        
-        self.start_angles_lbl.grid(row=row, column=2)
-        self.start_value_lbl.grid(row=row, column=3)
-        self.angles_lbl.grid(row=row, column=4)
-        self.value_lbl.grid(row=row, column=5)
-        self.best_angles_lbl.grid(row=row, column=6)
-        self.best_value_lbl.grid(row=row, column=7)
-        self.status_lbl.grid(row=row, column=8)
+        # Display values (one Treeview item, remote rows tagged blue)
+        self.tree.insert('', 'end', iid=self.iid,
+                         values=(self.row_idx + 1, "- , - , -", "-", "- , - , -", "-",
+                                 "- , - , -", "-", "Idle"),
+                         tags=('remote',) if self.is_remote else ())
         
         # Control buttons
         self.start_btn = tk.Button(self.frame, text="Optimize", 
@@ -87,27 +91,31 @@ class OptimizerRowExtended:
         btn_frame = tk.Frame(self.frame)
         self.start_btn.pack(in_=btn_frame, side=tk.LEFT)
         self.stop_btn.pack(in_=btn_frame, side=tk.LEFT, padx=4)
-        btn_frame.grid(row=row, column=9)
+        btn_frame.grid(row=row, column=2)
+    
+    def set_status(self, text: str):
+        """Show a status message in this row."""
+        self.tree.set(self.iid, 'status', text)
     
     def _on_progress(self, it, angles, value, best_angles, best_value):
         """Callback for optimization progress updates."""
         try:
             # Capture start on first callback
             if not self.started_set and it == 0:
-                self.start_angles_lbl.config(text=format_angles(angles))
-                self.start_value_lbl.config(text=format_number(int(value)))
+                self.tree.set(self.iid, 'start_angles', format_angles(angles))
+                self.tree.set(self.iid, 'start_value', format_number(int(value)))
                 self.started_set = True
             
-            self.angles_lbl.config(text=format_angles(angles))
-            self.value_lbl.config(text=format_number(int(value)))
-            self.best_angles_lbl.config(text=format_angles(best_angles))
-            self.best_value_lbl.config(text=format_number(int(best_value)))
-            self.status_lbl.config(text=f"Iter {it}")
+            self.tree.set(self.iid, 'angles', format_angles(angles))
+            self.tree.set(self.iid, 'value', format_number(int(value)))
+            self.tree.set(self.iid, 'best_angles', format_angles(best_angles))
+            self.tree.set(self.iid, 'best_value', format_number(int(best_value)))
+            self.set_status(f"Iter {it}")
             self.last_iter = it
             
             # Send progress update to peer (if local row and connected)
             if not self.is_remote and self.peer_connection and self.peer_connection.is_connected():
-                self.peer_connection.send_command('PROGRESS_UPDATE', {
+                self.peer_connection.send_command_batched('PROGRESS_UPDATE', {
                     'row_index': self.row_idx,
                     'iteration': it,
                     'angles': list(angles),
@@ -118,6 +126,20 @@ class OptimizerRowExtended:
         except Exception:
             pass
     
+    def handle_remote_start(self, data: dict):
+        """Handle optimization start requested by remote peer (local rows only)."""
+        if self.is_remote:
+            return
+        self.channel_box.set(data.get('channel', 1))
+        if data.get('serial'):
+            self.serial_var.set(data['serial'])
+        self._on_start()
+    
+    def handle_remote_stop(self, data: dict):
+        """Handle optimization stop requested by remote peer (local rows only)."""
+        if not self.is_remote:
+            self._on_stop()
+    
     def handle_remote_progress(self, data: dict):
         """Handle progress update from remote peer."""
         try:
@@ -136,7 +158,7 @@ class OptimizerRowExtended:
         """Handle status update from remote peer."""
         try:
             status = data.get('status', 'Unknown')
-            self.status_lbl.config(text=status)
+            self.set_status(status)
             
             if status in ['Kész', 'Hiba', 'Idle', 'Leállítva']:
                 self.start_btn['state'] = tk.NORMAL
@@ -148,14 +170,14 @@ class OptimizerRowExtended:
     def _send_status_to_peer(self, status: str):
         """Send status update to peer."""
         if self.peer_connection and self.peer_connection.is_connected():
-            self.peer_connection.send_command('STATUS_UPDATE', {
+            self.peer_connection.send_command_batched('STATUS_UPDATE', {
                 'row_index': self.row_idx,
                 'status': status
             })
     
     def _run_optimization_local(self):
         """Run local optimization process."""
-        self.status_lbl.config(text="Csatlakozás...")
+        self.set_status("Csatlakozás...")
         self._send_status_to_peer("Csatlakozás...")
         
         serial = self.serial_var.get().strip()
@@ -166,7 +188,7 @@ class OptimizerRowExtended:
             channel = 1
         
         if not serial:
-            self.status_lbl.config(text="Hiányzó serial")
+            self.set_status("Hiányzó serial")
             self._send_status_to_peer("Hiányzó serial")
             self.start_btn['state'] = tk.NORMAL
             self.stop_btn['state'] = tk.DISABLED
@@ -176,7 +198,7 @@ class OptimizerRowExtended:
         try:
             self.controller = MPC320Controller(serial, channel).connect()
         except Exception:
-            self.status_lbl.config(text="Polarizer hiba")
+            self.set_status("Polarizer hiba")
             self._send_status_to_peer("Polarizer hiba")
             self.start_btn['state'] = tk.NORMAL
             self.stop_btn['state'] = tk.DISABLED
@@ -188,7 +210,7 @@ class OptimizerRowExtended:
         except Exception as e:
             import logging
             logging.exception(f"TC connection failed to {self.tc_address}: {e}")
-            self.status_lbl.config(text=f"TC hiba: {str(e)[:20]}")
+            self.set_status(f"TC hiba: {str(e)[:20]}")
             self._send_status_to_peer(f"TC hiba: {str(e)[:20]}")
             try:
                 self.controller.disconnect()
@@ -199,7 +221,7 @@ class OptimizerRowExtended:
             self.stop_btn['state'] = tk.DISABLED
             return
         
-        self.status_lbl.config(text="Fut...")
+        self.set_status("Fut...")
         self._send_status_to_peer("Fut...")
         self.stop_event.clear()
         
@@ -222,10 +244,10 @@ class OptimizerRowExtended:
                 stop_event=self.stop_event,
             )
             final_status = f"Kész (iter {self.last_iter})"
-            self.status_lbl.config(text=final_status)
+            self.set_status(final_status)
             self._send_status_to_peer(final_status)
         except Exception:
-            self.status_lbl.config(text="Hiba")
+            self.set_status("Hiba")
             self._send_status_to_peer("Hiba")
         finally:
             self._cleanup_connections()
@@ -233,29 +255,33 @@ class OptimizerRowExtended:
     def _run_optimization_remote(self):
         """Send remote optimization command via peer connection."""
         if self.peer_connection is None or not self.peer_connection.is_connected():
-            self.status_lbl.config(text="Nincs kapcsolat")
+            self.set_status("Nincs kapcsolat")
             self.start_btn['state'] = tk.NORMAL
             self.stop_btn['state'] = tk.DISABLED
             return
         
-        serial = self.serial_var.get().strip()
-        
+        # Send start command to peer
+        success = self.peer_connection.send_command('OPTIMIZE_START', self.remote_start_payload())
+        self.remote_start_sent(success)
+    
+    def remote_start_payload(self) -> dict:
+        """Build the OPTIMIZE_START payload for this row."""
         try:
             channel = int(self.channel_box.get())
         except Exception:
             channel = 1
-        
-        # Send start command to peer
-        success = self.peer_connection.send_command('OPTIMIZE_START', {
+        return {
             'row_index': self.row_idx,
             'channel': channel,
-            'serial': serial
-        })
-        
+            'serial': self.serial_var.get().strip()
+        }
+    
+    def remote_start_sent(self, success: bool):
+        """Update row state after a remote start command was sent (or failed to send)."""
         if success:
-            self.status_lbl.config(text="Távoli fut...")
+            self.set_status("Távoli fut...")
         else:
-            self.status_lbl.config(text="Küldési hiba")
+            self.set_status("Küldési hiba")
             self.start_btn['state'] = tk.NORMAL
             self.stop_btn['state'] = tk.DISABLED
     
@@ -280,9 +306,7 @@ class OptimizerRowExtended:
     
     def _on_start(self):
         """Start button handler."""
-        self.start_btn['state'] = tk.DISABLED
-        self.stop_btn['state'] = tk.NORMAL
-        self.started_set = False
+        self.mark_started()
         
         if self.is_remote:
             # Send remote command
@@ -293,9 +317,15 @@ class OptimizerRowExtended:
         
         self.thread.start()
     
+    def mark_started(self):
+        """Switch buttons to the running state."""
+        self.start_btn['state'] = tk.DISABLED
+        self.stop_btn['state'] = tk.NORMAL
+        self.started_set = False
+    
     def _on_stop(self):
         """Stop button handler."""
-        self.status_lbl.config(text="Leállítás...")
+        self.set_status("Leállítás...")
         
         if self.is_remote:
             # Send stop command to peer
@@ -1,9 +1,35 @@
 """Command handlers for peer-to-peer communication."""
 
 import logging
+import threading
+from functools import partial
 
 logger = logging.getLogger(__name__)
 
+# Per-row commands: command -> (row index offset, OptimizerRowExtended method).
+# The peer's local rows 0-3 are our remote rows 4-7 and vice versa.
+ROW_COMMANDS = {
+    'OPTIMIZE_START': (-4, 'handle_remote_start'),
+    'OPTIMIZE_STOP': (-4, 'handle_remote_stop'),
+    'STATUS_UPDATE': (4, 'handle_remote_status'),
+    'PROGRESS_UPDATE': (4, 'handle_remote_progress'),
+}
+
+# Row updates the peer streams while optimizing; only the latest of each kind per
+# row is shown. Listed in apply order: a status (e.g. the final "Kész") must land
+# after any progress line of the same flush, never be overwritten by it.
+COALESCED_ROW_COMMANDS = ('PROGRESS_UPDATE', 'STATUS_UPDATE')
+
+# Wire dtypes accepted for TIMESTAMP_BATCH reference seconds ('ref_dtype');
+# peers that predate the field send uint64 without naming it.
+REF_SECONDS_DTYPES = {None: '<u8', '<u8': '<u8', '<u4': '<u4'}
+
+# Batched row commands carry {'items': [...]}, each item handled like the single command.
+BATCH_ROW_COMMANDS = {
+    'OPTIMIZE_START_BATCH': 'OPTIMIZE_START',
+    'OPTIMIZE_STOP_BATCH': 'OPTIMIZE_STOP',
+}
+
 
 class PeerCommandHandlers:
     """Centralized handlers for peer connection commands."""
@@ -16,58 +42,87 @@ class PeerCommandHandlers:
             app: Reference to main App instance
         """
         self.app = app
+        # row_index -> {command: (handler, latest data)}, flushed once per Tk idle
+        self._pending_rows = {}
+        self._pending_lock = threading.Lock()
+        self._flush_scheduled = False
     
     def register_all(self, peer_connection):
-        """Register all command handlers with peer connection."""
-        peer_connection.register_command_handler('OPTIMIZE_START', self.handle_optimize_start)
-        peer_connection.register_command_handler('OPTIMIZE_STOP', self.handle_optimize_stop)
-        peer_connection.register_command_handler('STATUS_UPDATE', self.handle_status_update)
-        peer_connection.register_command_handler('PROGRESS_UPDATE', self.handle_progress_update)
-        peer_connection.register_command_handler('STREAMING_START', self.handle_streaming_start)
-        peer_connection.register_command_handler('STREAMING_STOP', self.handle_streaming_stop)
+        """Register all command handlers with peer connection.
+        
+        Handlers run on the network receiver thread. Those that touch Tk
+        widgets or variables are posted to the Tk event loop; the pure data
+        handlers (timestamps, counters) stay on the receiver thread.
+        """
+        tk = self._on_tk_thread
+        for command, (offset, method) in ROW_COMMANDS.items():
+            handler = partial(self.dispatch_row_command, offset, method)
+            if command in COALESCED_ROW_COMMANDS:
+                handler = self._coalesce_row_updates(command, handler)
+            else:
+                handler = tk(handler)
+            peer_connection.register_command_handler(command, handler)
+        for command, single in BATCH_ROW_COMMANDS.items():
+            peer_connection.register_command_handler(
+                command, tk(partial(self.dispatch_row_batch, *ROW_COMMANDS[single])))
+        peer_connection.register_command_handler('STREAMING_START', tk(self.handle_streaming_start))
+        peer_connection.register_command_handler('STREAMING_STOP', tk(self.handle_streaming_stop))
         peer_connection.register_command_handler('TIMESTAMP_BATCH', self.handle_timestamp_batch)
         peer_connection.register_command_handler('COUNTER_DATA', self.handle_counter_data)
-        peer_connection.register_command_handler('SAVE_SETTINGS_UPDATE', self.handle_save_settings_update)
-        peer_connection.register_command_handler('SAVE_SETTINGS_REQUEST', self.handle_save_settings_request)
+        peer_connection.register_command_handler('SAVE_SETTINGS_UPDATE', tk(self.handle_save_settings_update))
+        peer_connection.register_command_handler('SAVE_SETTINGS_REQUEST', tk(self.handle_save_settings_request))
         logger.info("Registered all peer command handlers")
     
+    def _on_tk_thread(self, handler):
+        """Wrap handler so it is called from the Tk event loop instead of the network thread."""
+        def post(data: dict):
+            try:
+                self.app.root.after_idle(handler, data)
+            except RuntimeError:
+                pass  # Tk main loop already gone (shutting down)
+        return post
+    
+    def _coalesce_row_updates(self, command, handler):
+        """Wrap handler so bursts of updates for a row reach the Tk loop as one call."""
+        def post(data: dict):
+            with self._pending_lock:
+                row_updates = self._pending_rows.setdefault(data.get('row_index', 0), {})
+                row_updates[command] = (handler, data)
+                if self._flush_scheduled:
+                    return
+                self._flush_scheduled = True
+            try:
+                self.app.root.after_idle(self._flush_row_updates)
+            except RuntimeError:
+                pass  # Tk main loop already gone (shutting down)
+        return post
+    
+    def _flush_row_updates(self):
+        """Apply the latest pending updates of every row (runs on the Tk thread)."""
+        with self._pending_lock:
+            pending = self._pending_rows
+            self._pending_rows = {}
+            self._flush_scheduled = False
+        for row_updates in pending.values():
+            for command in COALESCED_ROW_COMMANDS:
+                if command in row_updates:
+                    handler, data = row_updates[command]
+                    handler(data)
+    
     # Optimization control handlers
     
-    def handle_optimize_start(self, data: dict):
-        """Handle remote optimization start command."""
-        remote_row_idx = data.get('row_index', 0)
-        local_row_idx = remote_row_idx - 4  # Map 4-7 to 0-3
-        
-        if local_row_idx in self.app.optim_rows:
-            row = self.app.optim_rows[local_row_idx]
-            if not row.is_remote:
-                row.channel_box.set(data.get('channel', 1))
-                if data.get('serial'):
-                    row.serial_var.set(data['serial'])
-                row._on_start()
-    
-    def handle_optimize_stop(self, data: dict):
-        """Handle remote optimization stop command."""
-        local_row_idx = data.get('row_index', 0) - 4  # Map 4-7 to 0-3
-        
-        if local_row_idx in self.app.optim_rows:
-            row = self.app.optim_rows[local_row_idx]
-            if not row.is_remote:
-                row._on_stop()
-    
-    def handle_status_update(self, data: dict):
-        """Handle status update from remote peer."""
-        remote_row_idx = data.get('row_index', 0) + 4  # Map 0-3 to 4-7
-        
-        if remote_row_idx in self.app.optim_rows:
-            self.app.optim_rows[remote_row_idx].handle_remote_status(data)
+    def dispatch_row_command(self, offset: int, method: str, data: dict):
+        """Route a per-row command (see ROW_COMMANDS) to the matching optimizer row."""
+        # The polarizer rows are built lazily - the peer may need them earlier
+        self.app._ensure_optim_rows()
+        row = self.app.optim_rows.get(data.get('row_index', 0) + offset)
+        if row is not None:
+            getattr(row, method)(data)
     
-    def handle_progress_update(self, data: dict):
-        """Handle progress update from remote peer."""
-        remote_row_idx = data.get('row_index', 0) + 4  # Map 0-3 to 4-7
-        
-        if remote_row_idx in self.app.optim_rows:
-            self.app.optim_rows[remote_row_idx].handle_remote_progress(data)
+    def dispatch_row_batch(self, offset: int, method: str, data: dict):
+        """Route each item of a batched row command to its optimizer row."""
+        for item in data.get('items', []):
+            self.dispatch_row_command(offset, method, item)
     
     # Streaming control handlers
     
@@ -162,9 +217,16 @@ class PeerCommandHandlers:
                         # Decode reference seconds if available
                         ref_array = None
                         if ref_encoded:
+                            ref_dtype = REF_SECONDS_DTYPES.get(ts_data.get('ref_dtype'))
+                            if ref_dtype is None:
+                                # Drop just this channel, not the whole batch
+                                logger.warning("Ch%d: unknown ref_dtype %r - channel batch dropped",
+                                               channel, ts_data.get('ref_dtype'))
+                                continue
                             ref_compressed = base64.b64decode(ref_encoded)
                             ref_binary = zlib.decompress(ref_compressed)
-                            ref_array = np.frombuffer(ref_binary, dtype=np.uint64)
+                            # Buffers upcast to uint64 on insert
+                            ref_array = np.frombuffer(ref_binary, dtype=ref_dtype)
                         
                         # Add with reference seconds for proper cleanup
                         self.app.plot_updater.remote_buffers[channel].add_timestamps_array(ts_array, ref_array)
@@ -181,8 +243,9 @@ class PeerCommandHandlers:
         """Handle detector counter data received from remote peer."""
         try:
             counters = data.get('counters', [0, 0, 0, 0])
-            if len(counters) == 4:
+            if len(counters) == 4 and counters != getattr(self.app, 'remote_beutes_szamok', None):
                 self.app.remote_beutes_szamok = counters
+                self.app._schedule_counter_refresh()
         except Exception as e:
             logger.error(f"Error handling remote counter data: {e}")
     
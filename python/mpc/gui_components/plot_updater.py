@@ -16,6 +16,7 @@ from gui_components.config import (
     TIMESTAMP_BUFFER_DURATION_SEC,
     TIMESTAMP_BUFFER_MAX_SIZE,
     TIMESTAMP_BATCH_INTERVAL_SEC,
+    MAX_PLOT_POINTS,
     DEBUG_MODE
 )
 
@@ -31,6 +32,22 @@ class PlotUpdater:
         self.ax = ax
         self.canvas = canvas
 
+        # Blitting state: the static background is re-rendered only when the
+        # layout (mode, pairs, axis limits) changes; otherwise just the
+        # animated artists are redrawn on top of the cached background.
+        self._bg = None
+        self._layout_key = None
+        self._animated = []
+        self._lines = []
+        self._count_ylim = None
+        self._frame_timer = None  # GUI-loop frame timer (see start_animation)
+        self.visible = True  # Cleared by the app while the plot tab is hidden
+        self.disp_skip = 1  # Render only every Nth animation frame
+        self._frame_ctr = 0
+        self.plot_out = None  # Headless: image file rewritten after every rendered frame
+        self.canvas.mpl_connect('draw_event', self._on_draw_event)
+        self.canvas.mpl_connect('resize_event', self._on_resize_event)
+
         self.tc = tc
         self.default_acq_duration = default_acq_duration
         self.bin_width = bin_width
@@ -67,10 +84,13 @@ class PlotUpdater:
         # Coincidence counts (cross-site pairs only)
         # Pairs: (1,1), (2,2), (3,3), (4,4) 
         self.coincidence_series = np.zeros((4, 20))  # 4 pairs, 20 time points
+        self._disp_buf = np.empty_like(self.coincidence_series)  # per-frame display copy
         self.last_coincidence_counts = [0, 0, 0, 0]
         
         # Detector single counts (for display only)
         self.beutes_szamok = [0, 0, 0, 0]
+        # Called from the update thread with the new counts whenever they change
+        self.on_counts_updated = None
         
         # Stream client (will be initialized when streaming starts)
         self.stream_client: Optional[TimeControllerStreamClient] = None
@@ -123,7 +143,7 @@ class PlotUpdater:
             self.remote_buffers[ch].clear()
         
         # Reset coincidence tracking
-        self.coincidence_series = np.zeros((4, 20))
+        self.coincidence_series[:, :] = 0
         self.last_coincidence_counts = [0, 0, 0, 0]
         self.last_sent_timestamp = {1: 0, 2: 0, 3: 0, 4: 0}
         
@@ -505,6 +525,8 @@ class PlotUpdater:
             # Uses TIMESTAMP-BASED tracking: immune to buffer trimming/cleanup
             batch_data = {}
             total_ts = 0
+            # Peers on the old protocol read reference seconds as uint64 only
+            ref_u32 = self.peer_connection.peer_supports('ref_u32')
             for channel in [1, 2, 3, 4]:
                 all_timestamps, all_ref_seconds = self.local_buffers[channel].get_timestamps_with_ref()
                 
@@ -512,23 +534,29 @@ class PlotUpdater:
                     continue
                 
                 # Only send timestamps NEWER than the last one we sent
-                # This is immune to buffer trimming (no index tracking needed)
+                # This is immune to buffer trimming (no index tracking needed).
+                # Buffers are sorted, so the new ones are a tail slice (a view, no copy)
                 last_ts = self.last_sent_timestamp[channel]
-                mask = all_timestamps > last_ts
-                new_timestamps = all_timestamps[mask]
-                new_ref_seconds = all_ref_seconds[mask]
+                start = np.searchsorted(all_timestamps, last_ts, side='right')
+                new_timestamps = all_timestamps[start:]
+                new_ref_seconds = all_ref_seconds[start:]
                 
                 if len(new_timestamps) > 0:
                     # Update tracking with the latest timestamp value
                     self.last_sent_timestamp[channel] = int(all_timestamps[-1])
                     
-                    # Convert timestamps to binary (much more efficient than JSON)
-                    ts_binary = new_timestamps.tobytes()
-                    ref_binary = new_ref_seconds.tobytes()
-                    
-                    # Compress both arrays
-                    ts_compressed = zlib.compress(ts_binary, level=1)
-                    ref_compressed = zlib.compress(ref_binary, level=1)
+                    # Compress the raw array memory directly (zlib reads the buffer,
+                    # no intermediate tobytes() copy). Reference seconds are small
+                    # counters, so they go on the wire as uint32 LE - half the bytes -
+                    # when the peer understands that and no value would wrap.
+                    ts_compressed = zlib.compress(np.ascontiguousarray(new_timestamps), level=1)
+                    if ref_u32 and new_ref_seconds.max() <= 0xFFFFFFFF:
+                        ref_dtype = '<u4'
+                        ref_payload = new_ref_seconds.astype(ref_dtype)
+                    else:
+                        ref_dtype = '<u8'
+                        ref_payload = np.ascontiguousarray(new_ref_seconds, dtype=ref_dtype)
+                    ref_compressed = zlib.compress(ref_payload, level=1)
                     
                     # Encode as base64 for JSON transport
                     ts_encoded = base64.b64encode(ts_compressed).decode('ascii')
@@ -537,6 +565,7 @@ class PlotUpdater:
                     batch_data[channel] = {
                         'data': ts_encoded,
                         'ref_data': ref_encoded,
+                        'ref_dtype': ref_dtype,
                         'count': len(new_timestamps)
                     }
                     total_ts += len(new_timestamps)
@@ -557,11 +586,17 @@ class PlotUpdater:
         from utils.common import zmq_exec
         
         # Live counters from TC (singles rates display only)
+        counts = [0, 0, 0, 0]
         for j in range(1, 5):
             try:
-                self.beutes_szamok[j - 1] = int(safe_zmq_exec(self.tc, f"INPUt{j}:COUNter?", zmq_exec))
+                counts[j - 1] = int(safe_zmq_exec(self.tc, f"INPUt{j}:COUNter?", zmq_exec))
             except Exception:
-                self.beutes_szamok[j - 1] = random.randint(20000, 100000)
+                counts[j - 1] = random.randint(20000, 100000)
+        if counts != self.beutes_szamok:
+            self.beutes_szamok = counts
+            callback = self.on_counts_updated
+            if callback is not None:
+                callback(list(counts))
         
         # Calculate coincidences from timestamp buffers
         if self.streaming_active:
@@ -583,7 +618,7 @@ class PlotUpdater:
         # Send counter data to peer if connected
         if self.peer_connection and self.peer_connection.is_connected():
             try:
-                self.peer_connection.send_command('COUNTER_DATA', {'counters': self.beutes_szamok})
+                self.peer_connection.send_command_batched('COUNTER_DATA', {'counters': self.beutes_szamok})
             except Exception as e:
                 logger.error(f"Failed to send counter data to peer: {e}")
     
@@ -666,9 +701,9 @@ class PlotUpdater:
             l_end = np.searchsorted(ts_a, overlap_end, side='right')
             a_overlap = ts_a[l_start:l_end]
             
-            b_adj_arr = ts_b.astype(np.int64) - pair_offset
-            r_start = np.searchsorted(b_adj_arr, overlap_start, side='left')
-            r_end = np.searchsorted(b_adj_arr, overlap_end, side='right')
+            # Shift the bounds instead of the whole buffer (no per-pair full-size temporary)
+            r_start = np.searchsorted(ts_b, overlap_start + pair_offset, side='left')
+            r_end = np.searchsorted(ts_b, overlap_end + pair_offset, side='right')
             b_overlap = ts_b[r_start:r_end]
             
             count = self.coincidence_counter.count_coincidences(
@@ -686,12 +721,13 @@ class PlotUpdater:
             
             new_counts.append(rate)
         
-        # Update rolling window (shift left, add new value on right)
-        for i, count in enumerate(new_counts):
-            if i < len(self.coincidence_series):
-                self.coincidence_series[i] = np.roll(self.coincidence_series[i], -1)
-                self.coincidence_series[i, -1] = count
-                self.last_coincidence_counts[i] = count
+        # Update rolling window (shift left, add new value on right) for all pairs at once
+        n = min(len(new_counts), len(self.coincidence_series))
+        if n:
+            series = self.coincidence_series
+            series[:n, :-1] = series[:n, 1:]
+            series[:n, -1] = new_counts[:n]
+            self.last_coincidence_counts[:n] = new_counts[:n]
     
     def _clear_cross_site_data(self):
         """Clear cross-site data when peer disconnects."""
@@ -701,6 +737,82 @@ class PlotUpdater:
         self.coincidence_series[:, :] = 0
         self.last_coincidence_counts = [0, 0, 0, 0]
 
+    def _decimate_for_display(self, data: np.ndarray):
+        """Reduce each series to at most one point per horizontal canvas pixel.
+        
+        Agg draw time scales with the number of vertices, so series longer than
+        the canvas is wide are averaged down in equal-sized blocks before
+        plotting. The caller's array is left untouched for numerics.
+        
+        Returns:
+            (x, data) where x holds the block centres in original sample units
+        """
+        n = data.shape[-1]
+        width_px = int(self.fig.get_size_inches()[0] * self.fig.dpi)
+        max_points = max(1, min(width_px, MAX_PLOT_POINTS))
+        if n <= max_points:
+            return np.arange(n), data
+        
+        starts = (np.arange(max_points) * n) // max_points
+        counts = np.diff(np.append(starts, n))
+        decimated = np.add.reduceat(data, starts, axis=-1) / counts
+        return starts + (counts - 1) / 2.0, decimated
+
+    def _on_draw_event(self, event):
+        """Capture the freshly rendered background (also fires on resize)."""
+        self._bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _on_resize_event(self, event):
+        """Drop the cached background; the redraw after a resize re-captures it."""
+        self._bg = None
+
+    def _draw_animated(self):
+        """Draw the animated artists onto the current renderer."""
+        for artist in self._animated:
+            self.ax.draw_artist(artist)
+
+    def request_redraw(self):
+        """Schedule a full redraw on the next Tk idle cycle (coalesces requests)."""
+        self.canvas.draw_idle()
+
+    def _render(self, layout_key, build, update=None):
+        """Render one frame, blitting when the static layout is unchanged.
+        
+        Args:
+            layout_key: Hashable description of the static content
+            build: Draws static content and registers artists in self._animated
+            update: Refreshes the animated artists for this frame (optional)
+        """
+        if layout_key != self._layout_key:
+            self.ax.clear()
+            self.ax.tick_params(labelsize=8)  # clear() resets tick styling
+            self._animated = []
+            self._lines = []
+            build()
+            if update:
+                update()
+            self._layout_key = layout_key
+            self._bg = None  # Stale until the draw_event below re-captures it
+            self.request_redraw()
+            return
+        
+        if self._bg is None:
+            # Full draw still pending - let it pick up this frame's data
+            if update:
+                update()
+            self.request_redraw()
+            return
+        
+        if not self._animated:
+            return  # Static frame, nothing changed
+        if update:
+            update()
+        self.canvas.restore_region(self._bg)
+        self._draw_animated()
+        # Title sits outside ax.bbox, so blit the whole figure area
+        self.canvas.blit(self.fig.bbox)
+
     def _draw_coincidence_plot(self):
         """Draw coincidence time series plot.
         
@@ -709,8 +821,10 @@ class PlotUpdater:
         import datetime
         
         if not self.app_ref or not hasattr(self.app_ref, 'correlation_pairs'):
-            self.ax.text(0.5, 0.5, 'No correlation pairs configured', 
-                        ha='center', va='center', transform=self.ax.transAxes)
+            def build():
+                self.ax.text(0.5, 0.5, 'No correlation pairs configured', 
+                            ha='center', va='center', transform=self.ax.transAxes)
+            self._render(('no_pairs',), build)
             return
         
         pairs = list(self.app_ref.correlation_pairs)[:4]
@@ -726,84 +840,171 @@ class PlotUpdater:
             
             # Check if this is server (Wigner) - it doesn't receive remote timestamps
             if self.app_ref.computer_role == "computer_a" and has_remote_pair:
-                current_time = datetime.datetime.now().strftime('%H:%M:%S')
-                self.ax.text(0.5, 0.5, 
-                            f'Server Mode (Wigner) - Sending timestamps to BME\n\n'
-                            f'Coincidence detection runs on BME (client) side\n'
-                            f'because BME receives timestamps from both sites.\n\n'
-                            f'Last update: {current_time}',
-                            ha='center', va='center', transform=self.ax.transAxes,
-                            fontsize=11, bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.8))
+                def build():
+                    msg = self.ax.text(0.5, 0.5, '',
+                                       ha='center', va='center', transform=self.ax.transAxes,
+                                       fontsize=11, bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.8),
+                                       animated=True)
+                    self._animated.append(msg)
+                
+                def update():
+                    current_time = datetime.datetime.now().strftime('%H:%M:%S')
+                    self._animated[0].set_text(
+                        f'Server Mode (Wigner) - Sending timestamps to BME\n\n'
+                        f'Coincidence detection runs on BME (client) side\n'
+                        f'because BME receives timestamps from both sites.\n\n'
+                        f'Last update: {current_time}')
+                
+                self._render(('server',), build, update)
                 return
         
-        data = self.coincidence_series.copy()
-        
+        # Snapshot into the reused display buffer (the update thread keeps writing)
+        data = self._disp_buf
         if self.normalize_plot:
-            col_sum = np.sum(data, axis=0)
+            col_sum = np.sum(self.coincidence_series, axis=0)
             with np.errstate(divide='ignore', invalid='ignore'):
-                data = np.nan_to_num(data / col_sum, nan=0.0, posinf=0.0, neginf=0.0)
+                np.divide(self.coincidence_series, col_sum, out=data)
+            np.nan_to_num(data, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+        else:
+            np.copyto(data, self.coincidence_series)
         
         # Plot colors for up to 4 pairs
         colors = ['purple', 'orange', 'brown', 'pink']
         src_name = lambda s: "Local" if s == "L" else "Remote"
-        
-        for idx, (src_a, ch_a, src_b, ch_b, ofs_idx) in enumerate(pairs):
-            if idx >= len(data):
-                break
-            label = f"{src_name(src_a)}-{ch_a} ↔ {src_name(src_b)}-{ch_b} [Ofs{ofs_idx+1}]"
-            self.ax.plot(data[idx], color=colors[idx % len(colors)], marker='o', 
-                        linestyle='-', linewidth=2, label=label)
-        
-        self.ax.legend(loc='upper left', fontsize=10)
+        x, plot_data = self._decimate_for_display(data)
         
         # Auto-scale y-axis based on data (with some padding)
         if self.normalize_plot:
-            self.ax.set_ylim([-0.05, 1.05])
+            ylim = (-0.05, 1.05)
         else:
             max_count = max(1, np.max(data))
             # Use minimum y-limit of 10 so zeros are clearly visible as flat line
             y_max = max(10, max_count * 1.2)
-            self.ax.set_ylim([-y_max * 0.05, y_max])
+            # Keep the current scale while the data still fits and fills at least
+            # half of it, so the background is only re-rendered on large changes
+            if self._count_ylim is not None:
+                cur_max = self._count_ylim[1]
+                if max_count <= cur_max and y_max >= cur_max * 0.5:
+                    y_max = cur_max
+            ylim = (-y_max * 0.05, y_max)
+            self._count_ylim = ylim
         
-        # Show current time and window info in title for visual feedback
-        import datetime
-        current_time = datetime.datetime.now().strftime('%H:%M:%S')
-        window_ps = self.coincidence_counter.window_ps
-        self.ax.set_title(f'Coincidences | Window: ±{window_ps:,} ps | {current_time}', 
-                         fontsize=11, fontweight='bold')
-        self.ax.set_xlabel('Time Point (0.5s intervals)')
-        self.ax.set_ylabel('Coincidences/s' if not self.normalize_plot else 'Normalized')
-        self.ax.set_xticks(range(0, 20))
-        self.ax.grid(True, alpha=0.3)
+        def build():
+            for idx, (src_a, ch_a, src_b, ch_b, ofs_idx) in enumerate(pairs):
+                if idx >= len(plot_data):
+                    break
+                label = f"{src_name(src_a)}-{ch_a} ↔ {src_name(src_b)}-{ch_b} [Ofs{ofs_idx+1}]"
+                line, = self.ax.plot(x, plot_data[idx], color=colors[idx % len(colors)], marker='o', 
+                                     linestyle='-', linewidth=2, label=label, animated=True)
+                self._lines.append(line)
+            
+            legend = self.ax.legend(loc='upper left', fontsize=10)
+            legend.set_animated(True)
+            self.ax.set_ylim(ylim)
+            
+            # Title carries the current time and window info for visual feedback
+            title = self.ax.set_title('', fontsize=11, fontweight='bold')
+            title.set_animated(True)
+            self.ax.set_xlabel('Time Point (0.5s intervals)')
+            self.ax.set_ylabel('Coincidences/s' if not self.normalize_plot else 'Normalized')
+            self.ax.set_xticks(range(0, 20, 2))
+            self.ax.grid(True, alpha=0.3)
+            self._animated = self._lines + [legend, title]
+        
+        def update():
+            # x only changes with the layout key, so only the y values are replaced
+            for line, series in zip(self._lines, plot_data):
+                line.set_ydata(series)
+            current_time = datetime.datetime.now().strftime('%H:%M:%S')
+            window_ps = self.coincidence_counter.window_ps
+            self.ax.title.set_text(f'Coincidences | Window: ±{window_ps:,} ps | {current_time}')
+        
+        self._render(('pairs', tuple(pairs), self.normalize_plot, ylim, len(x)), build, update)
 
     def _draw_plot(self):
         """Update the plot based on current mode."""
-        self.ax.clear()
-
+        if not self.visible:
+            return  # Nobody can see it; the next visible frame catches up
+        
         # Draw coincidence plot (or placeholder if not streaming yet)
         if self.streaming_active:
             self._draw_coincidence_plot()
         else:
             # Show message when not streaming
-            self.ax.text(0.5, 0.5,
-                        'Timestamp Streaming Not Started\n\n'
-                        'Click "Start" to begin recording\n'
-                        'and see live coincidence measurements',
-                        ha='center', va='center', transform=self.ax.transAxes,
-                        fontsize=12, bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.5))
+            def build():
+                self.ax.text(0.5, 0.5,
+                            'Timestamp Streaming Not Started\n\n'
+                            'Click "Start" to begin recording\n'
+                            'and see live coincidence measurements',
+                            ha='center', va='center', transform=self.ax.transAxes,
+                            fontsize=12, bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.5))
+            self._render(('idle',), build)
 
-        self.canvas.draw()
+    def set_visible(self, visible: bool):
+        """Pause or resume rendering; catch up at once when shown again."""
+        was_visible, self.visible = self.visible, visible
+        if visible and not was_visible and self._frame_timer is not None:
+            # Don't leave the stale frame up until the next timer tick
+            self.animate_frame()
+
+    def start_animation(self, interval_ms: int = 500):
+        """Render frames from the GUI event loop instead of the update thread.
+        
+        Uses the canvas' own timer (what FuncAnimation drives internally), so
+        the blitting in _render runs on the Tk thread. The background thread
+        then only does measurements.
+        """
+        if self._frame_timer is not None:
+            return
+        timer = self.canvas.new_timer(interval=interval_ms)
+        timer.add_callback(self.animate_frame, None)
+        timer.start()
+        self._frame_timer = timer
+
+    def animate_frame(self, frame=None):
+        """Render one frame; returns the artists that are blitted each frame."""
+        self._frame_ctr += 1
+        if self._frame_ctr % self.disp_skip:
+            return self._animated
+        try:
+            self._draw_plot()
+        except Exception as e:
+            logger.error("Error drawing plot frame: %s", e, exc_info=True)
+        return self._animated
 
     def _loop(self):
         """Main update loop running in background thread."""
         while self.continue_update:
             try:
                 self._update_measurements()
-                self._draw_plot()
+                if self._frame_timer is None:
+                    self._draw_plot()
+                    self._export_frame()
             except Exception as e:
                 logger.error(f"Error in plot update loop: {e}", exc_info=True)
             time.sleep(0.5)
 
+    def _export_frame(self):
+        """Write the rendered frame to plot_out (headless off-screen canvas).
+        
+        Saves the canvas' current pixel buffer rather than calling savefig:
+        savefig re-draws the figure and skips the animated (blitted) artists,
+        i.e. the data lines. The file is replaced atomically so a viewer never
+        reads a half-written image.
+        """
+        if not self.plot_out:
+            return
+        import matplotlib.image
+        
+        out = Path(self.plot_out)
+        tmp = out.with_name(out.name + '.tmp')
+        fmt = out.suffix.lstrip('.') or 'png'
+        try:
+            matplotlib.image.imsave(tmp, np.asarray(self.canvas.buffer_rgba()), format=fmt)
+            tmp.replace(out)
+        except Exception as e:
+            logger.error("Could not write plot image %s: %s", out, e)
+
     def start_counter_display(self):
         """Start only the counter display loop (singles rates monitoring).
         
@@ -863,6 +1064,11 @@ class PlotUpdater:
 
     def stop(self):
         """Stop the background update thread and timestamp streaming."""
+        # Stop GUI frame rendering
+        if self._frame_timer is not None:
+            self._frame_timer.stop()
+            self._frame_timer = None
+        
         if not self.continue_update:
             return
         
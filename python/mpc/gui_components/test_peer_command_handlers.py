@@ -0,0 +1,75 @@
+"""
+Test for the per-row coalescing of peer STATUS/PROGRESS updates.
+
+Drives PeerCommandHandlers with a stand-in app and peer connection, so it
+needs no Tk display or network.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui_components.peer_command_handlers import PeerCommandHandlers
+
+
+class _Root:
+    """Collects after_idle callbacks instead of running a Tk loop."""
+    def __init__(self):
+        self.idle = []
+
+    def after_idle(self, func, *args):
+        self.idle.append((func, args))
+
+    def run_idle(self):
+        while self.idle:
+            func, args = self.idle.pop(0)
+            func(*args)
+
+
+class _Row:
+    """Records the row's status text the way OptimizerRowExtended shows it."""
+    def __init__(self):
+        self.status = None
+
+    def handle_remote_progress(self, data):
+        self.status = f"Iter {data['iteration']}"
+
+    def handle_remote_status(self, data):
+        self.status = data['status']
+
+
+class _App:
+    def __init__(self):
+        self.root = _Root()
+        self.optim_rows = {4: _Row()}
+
+    def _ensure_optim_rows(self):
+        pass
+
+
+class _Peer:
+    def __init__(self):
+        self.handlers = {}
+
+    def register_command_handler(self, command, handler):
+        self.handlers[command] = handler
+
+
+def test_final_status_wins_over_coalesced_progress():
+    app = _App()
+    peer = _Peer()
+    PeerCommandHandlers(app).register_all(peer)
+
+    # Peer's row 0 is our remote row 4
+    peer.handlers['PROGRESS_UPDATE']({'row_index': 0, 'iteration': 1})
+    peer.handlers['STATUS_UPDATE']({'row_index': 0, 'status': 'Kész'})
+    peer.handlers['PROGRESS_UPDATE']({'row_index': 0, 'iteration': 2})
+    assert len(app.root.idle) == 1, "burst should schedule a single flush"
+
+    app.root.run_idle()
+    assert app.optim_rows[4].status == 'Kész'
+
+
+if __name__ == "__main__":
+    test_final_status_wins_over_coalesced_progress()
+    print("OK")
@@ -9,6 +9,7 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
 import logging
 import threading
 from pathlib import Path
@@ -339,7 +340,7 @@ class TimeOffsetTab:
         self.canvas = FigureCanvasTkAgg(self.fig, master=plot_frame)
         self.canvas.get_tk_widget().configure(background='#F5F5F5')
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        self.canvas.draw()
+        self.canvas.draw_idle()
     
     def _update_file_status(self):
         """Update file selection status label."""
@@ -599,7 +600,7 @@ class TimeOffsetTab:
             self.ax.legend(fontsize=8)
             self.ax.grid(True, alpha=0.3)
             
-            self.canvas.draw()
+            self.canvas.draw_idle()
             
         except Exception as e:
             logger.error(f"Failed to update preview plot: {e}")
@@ -614,7 +615,9 @@ class TimeOffsetTab:
         plot_window.title("Full Correlation Function")
         plot_window.geometry("1000x600")
         
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8), facecolor='#F5F5F5')
+        # Plain Figure, not registered with pyplot - freed with its window
+        fig = Figure(figsize=(10, 8), facecolor='#F5F5F5')
+        ax1, ax2 = fig.subplots(2, 1)
         ax1.set_facecolor('#FFFFFF')
         ax2.set_facecolor('#FFFFFF')
         
@@ -652,7 +655,7 @@ class TimeOffsetTab:
         
         canvas = FigureCanvasTkAgg(fig, master=plot_window)
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        canvas.draw()
+        canvas.draw_idle()
     
     def _save_to_config(self):
         """Save calculated offset to the selected offset slot."""
@@ -1,13 +1,22 @@
 import tkinter as tk
 from tkinter import ttk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import matplotlib
+matplotlib.use('TkAgg')  # Select explicitly so we never fall back to TkCairo
+import matplotlib.style
+# 'fast' = path simplification + Agg path chunking; display-only plots don't need exact paths
+matplotlib.style.use('fast')
+import argparse
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, wait
 import logging
 import json
 import os
+import sys
 import time
+import threading
 from datetime import datetime
-import numpy as np
+from functools import partial
+from typing import TYPE_CHECKING
 
 # Suppress matplotlib debug logging (not part of this app)
 logging.getLogger('matplotlib').setLevel(logging.WARNING)
@@ -23,17 +32,51 @@ from gui_components import (
     format_number, PlotUpdater, OptimizerRowExtended
 )
 from gui_components.file_transfer_manager import FileTransferManager
+from gui_components.optimizer_row_extended import DISPLAY_COLUMNS as OPTIM_DISPLAY_COLUMNS
 from gui_components.peer_command_handlers import PeerCommandHandlers
-from gui_components.time_offset_tab import TimeOffsetTab
-from gui_components.offline_correlation_tab import OfflineCorrelationTab
-from gui_components.config import CALIBRATION_DURATION_SEC
+from gui_components.config import (
+    CALIBRATION_DURATION_SEC, PEER_CONNECT_ATTEMPTS, PEER_CONNECT_BACKOFF_MS
+)
 from streaming.live_offset_calibrator import LiveOffsetCalibrator, CalibrationResult
 from mock_time_controller import MockTimeController, is_mock_controller
-from peer_connection import PeerConnection
 from connection_dialog import show_connection_dialog
 
+# Heavy modules (matplotlib canvases, pyplot-based tabs, crypto channel) are
+# imported where first used so the connection dialog comes up sooner.
+if TYPE_CHECKING:
+    from peer_connection import PeerConnection
+
 logger = logging.getLogger(__name__)
 
+# Connection status banner: (text, ttk style - colours are set in _setup_styles)
+_STATUS_WAITING = ("⏳ WAITING for peer connection...", 'Waiting.Status.TLabel')
+_STATUS_STANDALONE = ("⚠️ STANDALONE MODE: Peer connection disabled", 'Standalone.Status.TLabel')
+
+# Column headers for the per-row optimizer input widgets; the read-only
+# values are headed by the group's Treeview (OPTIM_DISPLAY_COLUMNS)
+OPTIM_INPUT_HEADERS = ("Serial Number", "TC Ch", "Actions")
+
+# Shared widget options for the live counter cells (green = local, blue = remote)
+_FONT_CELL = ('Arial', 8)
+_LOCAL_KW = {'background': '#E8F5E9'}
+_REMOTE_KW = {'background': '#E3F2FD'}
+_SAVE_CB_KW = {'text': 'Save', 'font': _FONT_CELL}
+
+# Time offset status line colours (configured / not configured)
+_OFFSET_SET_COLOR = '#2E7D32'
+_OFFSET_UNSET_COLOR = '#F57C00'
+
+
+def _parse_offset(text: str) -> int:
+    """Parse an offset in ps; accepts format_number's space grouping and '_'.
+    
+    Integers are parsed exactly; anything else (e.g. '1.5e6') goes through float.
+    """
+    text = text.replace(' ', '').replace('_', '')
+    if text.lstrip('+-').isdigit():
+        return int(text)
+    return int(float(text))
+
 
 class App:
     """Main application class for the GUI."""
@@ -57,9 +100,13 @@ class App:
         if hasattr(self, 'time_offsets_updated'):
             self.time_offsets_updated[0] = value
 
-    def __init__(self, root):
+    def __init__(self, root, headless: bool = False, plot_out: str = None):
         self.root = root
         self.root.title("Eszköz optimalizáló")
+        # Headless: the Tk control window is still built (needs a display), but
+        # the coincidence plot renders off-screen (Agg) into the plot_out image
+        self.headless = headless
+        self.plot_out = plot_out
 
         # Apply theme colors
         self.bg_color = BG_COLOR
@@ -69,8 +116,29 @@ class App:
         self.action_color = ACTION_COLOR
 
         # Peer-to-peer connection
-        self.peer_connection: PeerConnection = None
+        self.peer_connection: "PeerConnection" = None
         self.connection_status_label = None
+        self._status_labels = {}  # (text, style) -> label, see _show_connection_status
+        self._peer_state_seen = None  # Peer state the status label was last rendered for
+        self._last_conn_status = None  # (text, style) currently shown on the status label
+        self._last_peer_ip = None
+        self._status_connected = None  # cached connected (text, style) for _last_peer_ip
+        # Counter labels are refreshed on demand; stays True (= blocked) until they exist
+        self._counter_refresh_pending = True
+        
+        # Shutdown steps, registered as resources are created and run LIFO by _on_close
+        self._exit_stack = contextlib.ExitStack()
+        self._figures = []  # pyplot figures created by our tabs, closed on exit
+        self._add_cleanup("closing matplotlib figures", self._close_pyplot_figures)
+        
+        # Worker threads started by the app; stopped via _shutdown and joined on close
+        self._shutdown = threading.Event()
+        self._threads = []
+        self._add_cleanup("joining worker threads", self._join_threads)
+        
+        # Shared UI timer: [callback, period_ms, next_due_ms] entries driven by _tick
+        self._tickers = []
+        self._tick_id = None
         self.computer_role = "computer_a"  # Default role
         
         # Correlation pairs: (source_a, ch_a, source_b, ch_b, offset_idx)
@@ -86,18 +154,34 @@ class App:
         # Four independent offsets — each correlation pair selects which to use
         self.time_offsets_ps = [None, None, None, None]
         self.time_offsets_updated = [None, None, None, None]
+        self._offset_cfg_cache = None  # (mtime_ns, parsed dict) of time_offset_config.json
         self._load_time_offset()
         
         # Show connection dialog
         self._setup_peer_connection()
-        
-
 
         # Initialize Time Controller
         self.tc = self._connect_time_controller()
+        self._add_cleanup("closing connections", self._close_connections)
         
         # Optimizer rows state
         self.optim_rows = {}
+        self._pending_optim_rows = []  # (frame, tree, row, is_remote, defaults) not built yet
+        self._rows_loading_label = None
+        
+        # Tabs built on first selection: tab frame -> builder / placeholder.
+        # A tab is pending exactly while it still has a builder here.
+        self._tab_builders = {}
+        self._tab_placeholders = {}
+        
+        # Default (serial, channel) per optimizer row - role is fixed from here on.
+        # The peer computer's devices are our "remote" rows.
+        if self.computer_role == "computer_a":
+            own_serials, peer_serials = DEFAULT_LOCAL_SERIALS, DEFAULT_REMOTE_SERIALS
+        else:
+            own_serials, peer_serials = DEFAULT_REMOTE_SERIALS, DEFAULT_LOCAL_SERIALS
+        self._local_defaults = self._pad_serials(own_serials, None)
+        self._remote_defaults = self._pad_serials(peer_serials, "")
 
         # Setup UI layout
         self._setup_layout()
@@ -106,9 +190,10 @@ class App:
         self._build_notebook()
         self._build_plot_frame()
         self._build_plot_tab()
-        self._build_polarizer_tab()
-        self._build_time_offset_tab()
-        self._build_offline_correlation_tab()
+        self._defer_tab_build(self.tab_polarizer, self._build_polarizer_tab)
+        # These two pull in pyplot - only paid for once the user opens them
+        self._defer_tab_build(self.tab_time_offset, self._build_time_offset_tab)
+        self._defer_tab_build(self.tab_offline_correlation, self._build_offline_correlation_tab)
 
         # Auto-start counter display (for singles rates monitoring)
         # This starts the background loop that reads detector counters
@@ -116,9 +201,13 @@ class App:
         if hasattr(self, 'plot_updater') and self.plot_updater:
             self.plot_updater.start_counter_display()
             logger.info("Auto-started detector counter display")
+        
+        # Registered last so they run first on close
+        self._add_cleanup("cleaning up optimizer rows", self._cleanup_optim_rows)
+        self._add_cleanup("cancelling UI timer", self._cancel_ticks)
+        self._add_cleanup("stopping plot updater", self.plot_updater.stop)
 
         # Graceful shutdown handler
-        self._after_id = None
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _setup_peer_connection(self):
@@ -141,6 +230,8 @@ class App:
                 self.fs740_address = CLIENT_FS740_ADDRESS
             
             try:
+                from peer_connection import PeerConnection
+                
                 # For server: bind to 0.0.0.0 (all interfaces)
                 # For client: connect to the provided server IP
                 server_ip = "0.0.0.0" if role == "server" else config['server_ip']
@@ -150,9 +241,13 @@ class App:
                     server_ip=server_ip,
                     port=config['port']
                 )
+                self.peer_connection.on_state_change(self._on_peer_state_change)
                 
-                # Start connection (server listens, client connects)
-                if self.peer_connection.start():
+                # Server listens right away; client connects in the background
+                # so the window comes up while the peer is still starting
+                if role == "client":
+                    self.root.after(50, self._connect_peer_async, 0)
+                elif self.peer_connection.start():
                     logger.info("Peer connection started successfully in %s mode", role)
                 else:
                     logger.error("Failed to start peer connection")
@@ -175,28 +270,112 @@ class App:
                 self.tc_address = CLIENT_TC_ADDRESS
                 self.fs740_address = CLIENT_FS740_ADDRESS
     
+    def _connect_peer_async(self, attempt: int):
+        """Run one client connect attempt on a worker thread."""
+        peer = self.peer_connection
+        if peer is None:
+            return
+        
+        def worker():
+            ok = peer.start(retries=1)
+            if self._shutdown.is_set():
+                return  # Window closed while connecting
+            try:
+                self.root.after(0, self._on_peer_connect_result, ok, attempt)
+            except Exception:
+                pass
+        
+        self._start_worker(worker, name=f"PeerConnect-{attempt + 1}")
+    
+    def _on_peer_connect_result(self, ok: bool, attempt: int):
+        """Handle a client connect attempt on the Tk thread, backing off on failure."""
+        if self.peer_connection is None:
+            return
+        if ok:
+            logger.info("Peer connection started successfully in client mode")
+        elif attempt + 1 < PEER_CONNECT_ATTEMPTS:
+            delay = PEER_CONNECT_BACKOFF_MS * (2 ** attempt)  # 50, 100, ... 3200 ms
+            self.root.after(delay, self._connect_peer_async, attempt + 1)
+            return
+        else:
+            logger.error("Failed to start peer connection")
+            self._enter_standalone()
+        self._update_connection_status()
+    
+    def _enter_standalone(self):
+        """Drop a peer connection that never came up and detach it from every component.
+        
+        The UI is built before the background connect finishes, so the peer
+        handlers, file transfer manager, plot updater and optimizer rows already
+        hold the connection object - leave them as if no peer was configured.
+        """
+        peer, self.peer_connection = self.peer_connection, None
+        try:
+            peer.close()
+        except Exception as e:
+            logger.error("Error closing failed peer connection: %s", e)
+        
+        self.peer_command_handlers = None
+        if self.file_transfer_manager is not None:
+            self.file_transfer_manager.stop()
+            self.file_transfer_manager = None
+        self.plot_updater.peer_connection = None
+        # Rows still pending are created from self.peer_connection, now None
+        for row in self.optim_rows.values():
+            row.peer_connection = None
+        
+        # Remove the remote counter panel (never built in standalone mode)
+        if self._remote_counters_frame is not None:
+            self._remote_counters_frame.destroy()
+            self._remote_counters_frame = None
+        self.remote_beutes_labels = []
+        self._remote_beutes_vars = []
+        self._remote_beutes_var_names = []
+        self.remote_save_vars = []
+        self.auto_transfer_var = None
+        self.transfer_status_label = None
+    
+    def _on_peer_state_change(self, connected: bool):
+        """Peer state callback (network thread) - refresh the status label on the Tk loop."""
+        try:
+            self.root.after_idle(self._update_connection_status)
+        except Exception:
+            pass  # Window already destroyed
+        # Remote counters switch between values and "---"
+        self._schedule_counter_refresh()
+    
     def _get_config_path(self):
         """Get path to time offset configuration file (relative to main_gui.py)."""
         script_dir = os.path.dirname(os.path.abspath(__file__))
         return os.path.join(script_dir, 'time_offset_config.json')
     
+    def _read_offset_config(self):
+        """Return the parsed offset config (None if missing), re-reading only when its mtime changed."""
+        config_path = self._get_config_path()
+        try:
+            mtime = os.stat(config_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if self._offset_cfg_cache is None or self._offset_cfg_cache[0] != mtime:
+            with open(config_path, 'r') as f:
+                self._offset_cfg_cache = (mtime, json.load(f))
+        return self._offset_cfg_cache[1]
+    
     def _load_time_offset(self):
         """Load time offsets from configuration file."""
         try:
-            config_path = self._get_config_path()
-            if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    data = json.load(f)
-                    # Support both old single-offset and new multi-offset format
-                    if 'offsets' in data:
-                        for i, ofs in enumerate(data['offsets'][:4]):
-                            self.time_offsets_ps[i] = ofs.get('offset_ps')
-                            self.time_offsets_updated[i] = ofs.get('updated')
-                    else:
-                        # Old format: {"offset_ps": ..., "updated": ...}
-                        self.time_offsets_ps[0] = data.get('offset_ps')
-                        self.time_offsets_updated[0] = data.get('updated')
-                    logger.info("Loaded time offsets: %s ps", self.time_offsets_ps)
+            data = self._read_offset_config()
+            if data is not None:
+                # Support both old single-offset and new multi-offset format
+                if 'offsets' in data:
+                    for i, ofs in enumerate(data['offsets'][:4]):
+                        self.time_offsets_ps[i] = ofs.get('offset_ps')
+                        self.time_offsets_updated[i] = ofs.get('updated')
+                else:
+                    # Old format: {"offset_ps": ..., "updated": ...}
+                    self.time_offsets_ps[0] = data.get('offset_ps')
+                    self.time_offsets_updated[0] = data.get('updated')
+                logger.info("Loaded time offsets: %s ps", self.time_offsets_ps)
         except Exception as e:
             logger.error("Failed to load time offset configuration: %s", e)
             self.time_offsets_ps = [None, None, None, None]
@@ -215,8 +394,15 @@ class App:
                 'offset_ps': self.time_offsets_ps[0],
                 'updated': self.time_offsets_updated[0]
             }
+            try:
+                unchanged = data == self._read_offset_config()
+            except ValueError:
+                unchanged = False  # Corrupt file - overwrite it
+            if unchanged:
+                return  # File already holds exactly this
             with open(config_path, 'w') as f:
                 json.dump(data, f, indent=2)
+            self._offset_cfg_cache = (os.stat(config_path).st_mtime_ns, data)
             logger.info("Saved time offsets: %s ps", self.time_offsets_ps)
         except Exception as e:
             logger.error("Failed to save time offset configuration: %s", e)
@@ -253,6 +439,7 @@ class App:
             self.bin_width = DEFAULT_BIN_WIDTH
             self.dlt = None
         
+        self.is_mock = is_mock_controller(tc)
         return tc
 
     
@@ -269,17 +456,17 @@ class App:
                 if recording_duration_sec <= 0:
                     recording_duration_sec = None
                 else:
-                    logger.info(f"Recording duration set to {recording_duration_sec} seconds")
+                    logger.info("Recording duration set to %d seconds", recording_duration_sec)
             except ValueError:
-                logger.warning(f"Invalid duration '{duration_str}', using unlimited")
+                logger.warning("Invalid duration '%s', using unlimited", duration_str)
                 recording_duration_sec = None
         
         # Get save settings from checkboxes
         local_save_channels = [i+1 for i in range(4) if self.local_save_vars[i].get()]
         remote_save_channels = [i+1 for i in range(4) if self.remote_save_vars[i].get()] if self.remote_save_vars else []
         
-        logger.info(f"Saving local channels: {local_save_channels}")
-        logger.info(f"Saving remote channels: {remote_save_channels}")
+        logger.info("Saving local channels: %s", local_save_channels)
+        logger.info("Saving remote channels: %s", remote_save_channels)
         
         # Start local streaming with save settings and duration
         if hasattr(self, 'plot_updater') and self.plot_updater:
@@ -291,7 +478,10 @@ class App:
         if recording_duration_sec:
             self.recording_start_time = time.time()
             self.recording_duration = recording_duration_sec
+            self._recording_end_time = self.recording_start_time + recording_duration_sec
             self._update_recording_timer()
+            self._unregister_tick(self._update_recording_timer)
+            self._register_tick(self._update_recording_timer, 500)
         
         # Send command to peer to start streaming (include duration)
         if self.peer_connection and self.peer_connection.is_connected():
@@ -301,7 +491,7 @@ class App:
                 })
                 logger.info("Sent STREAMING_START command to peer")
             except Exception as e:
-                logger.error(f"Failed to send STREAMING_START to peer: {e}")
+                logger.error("Failed to send STREAMING_START to peer: %s", e)
         else:
             logger.warning("No peer connection - streaming locally only")
     
@@ -310,8 +500,11 @@ class App:
         logger.info("Stopping synchronized streaming on both sites")
         
         # Clear recording timer
+        self._unregister_tick(self._update_recording_timer)
         self.recording_start_time = None
         self.recording_duration = None
+        self._recording_end_time = None
+        self._last_timer_secs = -1
         self.recording_timer_label.config(text="")
         
         # Stop local streaming (but keep counter display running)
@@ -324,7 +517,7 @@ class App:
                 self.peer_connection.send_command('STREAMING_STOP', {})
                 logger.info("Sent STREAMING_STOP command to peer")
             except Exception as e:
-                logger.error(f"Failed to send STREAMING_STOP to peer: {e}")
+                logger.error("Failed to send STREAMING_STOP to peer: %s", e)
         
         # Auto-transfer files if checkbox is checked
         if hasattr(self, 'auto_transfer_var') and self.auto_transfer_var and self.auto_transfer_var.get():
@@ -339,71 +532,136 @@ class App:
         self.root.rowconfigure(1, weight=0)  # Mock status bar row
         self.root.rowconfigure(2, weight=1)  # Main content row
         self.root.columnconfigure(0, weight=1)  # Only notebook column
+        self._setup_styles()
+
+    def _setup_styles(self):
+        """Define shared ttk styles (configured once instead of per widget)."""
+        style = ttk.Style()
+        style.configure('Header.TLabel', font=('Arial', 12, 'bold'), padding=(0, 8),
+                        background=self.primary_color, foreground=self.fg_color)
+        style.configure('LocalTitle.TLabel', font=('Arial', 11, 'bold'),
+                        foreground='#2E7D32', background='#E8F5E9')
+        style.configure('RemoteTitle.TLabel', font=('Arial', 11, 'bold'),
+                        foreground='#1565C0', background='#E3F2FD')
+        style.configure('LocalColumn.TLabel', font=('Arial', 9, 'bold'), background='#E8F5E9')
+        style.configure('RemoteColumn.TLabel', font=('Arial', 9, 'bold'), background='#E3F2FD')
+        style.configure('Optim.Treeview', rowheight=30)
+        style.configure('LocalBulk.TLabel', font=('Arial', 9, 'bold'), foreground='green')
+        style.configure('RemoteBulk.TLabel', font=('Arial', 9, 'bold'), foreground='blue')
+        # Connection / mock-mode banners
+        style.configure('Status.TLabel', font=('Arial', 10, 'bold'), foreground='white',
+                        anchor=tk.CENTER, padding=(0, 6))
+        style.configure('Connected.Status.TLabel', background='#4CAF50')  # Green
+        style.configure('Waiting.Status.TLabel', background='#FF9800')  # Orange
+        style.configure('Standalone.Status.TLabel', background='#9E9E9E')  # Gray
+        style.configure('Mock.Status.TLabel', background='#ff9800', padding=(0, 8))
 
     def _build_connection_status(self):
         """Build connection status indicator."""
         status_frame = tk.Frame(self.root, background='#2196F3', relief=tk.RAISED, bd=2)
         status_frame.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 2))
+        status_frame.columnconfigure(0, weight=1)
+        self._status_frame = status_frame
         
-        if self.peer_connection and self.peer_connection.is_connected():
-            peer_ip = self.peer_connection.get_peer_ip()
-            text = f"🔗 CONNECTED to peer: {peer_ip}"
-            bg_color = '#4CAF50'  # Green
-        elif self.peer_connection:
-            text = "⏳ WAITING for peer connection..."
-            bg_color = '#FF9800'  # Orange
-        else:
-            text = "⚠️ STANDALONE MODE: Peer connection disabled"
-            bg_color = '#9E9E9E'  # Gray
-        
-        self.connection_status_label = tk.Label(
-            status_frame,
-            text=text,
-            font=('Arial', 10, 'bold'),
-            background=bg_color,
-            foreground='white',
-            pady=6
-        )
-        self.connection_status_label.pack(fill=tk.BOTH, expand=True)
+        self._peer_state_seen = self._peer_state_key()
+        self._show_connection_status(self._connection_status())
         
-        # Start periodic status update
-        self._update_connection_status()
+        # State changes are pushed by PeerConnection; the poll is only a safety net
+        self._register_tick(self._update_connection_status, 5000)
+    
+    def _connection_status(self):
+        """Return the (text, style) pair for the current peer state."""
+        if self.peer_connection is None:
+            return _STATUS_STANDALONE
+        if not self.peer_connection.is_connected():
+            return _STATUS_WAITING
+        peer_ip = self.peer_connection.get_peer_ip()
+        if peer_ip != self._last_peer_ip:
+            self._last_peer_ip = peer_ip
+            self._status_connected = (f"🔗 CONNECTED to peer: {peer_ip}", 'Connected.Status.TLabel')
+        return self._status_connected
+    
+    def _peer_state_key(self):
+        """Identify the current peer state (connection object + its state version)."""
+        if self.peer_connection is None:
+            return None
+        return (id(self.peer_connection), self.peer_connection.state_version)
     
     def _update_connection_status(self):
-        """Periodically update connection status."""
-        if self.connection_status_label and self.connection_status_label.winfo_exists():
-            if self.peer_connection and self.peer_connection.is_connected():
-                peer_ip = self.peer_connection.get_peer_ip()
-                text = f"🔗 CONNECTED to peer: {peer_ip}"
-                bg_color = '#4CAF50'
-            elif self.peer_connection:
-                text = "⏳ WAITING for peer connection..."
-                bg_color = '#FF9800'
-            else:
-                text = "⚠️ STANDALONE MODE: Peer connection disabled"
-                bg_color = '#9E9E9E'
-            
-            self.connection_status_label.config(text=text, background=bg_color)
+        """Update connection status label, only when the peer state actually changed."""
+        if self.connection_status_label is None:
+            return
+        state = self._peer_state_key()
+        if state == self._peer_state_seen:
+            return
+        self._peer_state_seen = state
+        
+        status = self._connection_status()
+        # A reconnect to the same peer bumps the version but looks identical
+        if status == self._last_conn_status:
+            return
+        try:
+            self._show_connection_status(status)
+        except tk.TclError:
+            pass  # Label destroyed during shutdown
+    
+    def _show_connection_status(self, status):
+        """Raise the label for status, creating it the first time that status is shown.
         
-        if self.root.winfo_exists():
-            self.root.after(1000, self._update_connection_status)
+        Each distinct status text gets its own label stacked in the same cell, so
+        switching states is a raise instead of re-laying out the emoji text.
+        """
+        label = self._status_labels.get(status)
+        if label is None:
+            label = ttk.Label(self._status_frame, text=status[0], style=status[1])
+            label.grid(row=0, column=0, sticky="nsew")
+            self._status_labels[status] = label
+        label.tkraise()
+        self.connection_status_label = label
+        self._last_conn_status = status
+    
+    def _register_tick(self, callback, period_ms: int):
+        """Run callback every period_ms from the shared UI timer (first run on idle)."""
+        self._tickers.append([callback, period_ms, 0.0])
+        if self._tick_id is None:
+            self._tick_id = self.root.after_idle(self._tick)
+    
+    def _unregister_tick(self, callback):
+        """Stop calling callback from the shared UI timer."""
+        self._tickers = [t for t in self._tickers if t[0] != callback]
+    
+    def _tick(self):
+        """Single Tk timer that fans out to all registered periodic callbacks."""
+        now = time.monotonic() * 1000
+        for entry in list(self._tickers):
+            callback, period_ms, next_due = entry
+            if now >= next_due:
+                entry[2] = now + period_ms
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error("Periodic UI update %s failed: %s", callback.__name__, e)
+        
+        if not self._tickers:
+            self._tick_id = None
+            return
+        # Sleep until the next callback is due (capped so new registrations are picked up)
+        delay = min(t[2] for t in self._tickers) - time.monotonic() * 1000
+        self._tick_id = self.root.after(max(1, min(int(delay), 1000)), self._tick)
     
     def _build_status_indicator(self):
         """Build status indicator bar for mock mode."""
-        if is_mock_controller(self.tc):
+        if self.is_mock:
             # Get correlation mode from config
             from gui_components.config import MOCK_CORRELATION_MODE
             mode_text = "Cross-Site" if MOCK_CORRELATION_MODE == 'cross_site' else "Local Pairs"
             
             status_frame = tk.Frame(self.root, background='#ff9800', relief=tk.RAISED, bd=2)
             status_frame.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(0, 5))
-            status_label = tk.Label(
+            status_label = ttk.Label(
                 status_frame,
                 text=f"⚠️ MOCK MODE: {mode_text} Correlations - Time Controller not connected",
-                font=('Arial', 10, 'bold'),
-                background='#ff9800',
-                foreground='white',
-                pady=8
+                style='Mock.Status.TLabel'
             )
             status_label.pack(fill=tk.BOTH, expand=True)
 
@@ -419,6 +677,30 @@ class App:
         self.notebook.add(self.tab_time_offset, text="Időeltolás Kalkulátor")
         self.notebook.add(self.tab_offline_correlation, text="Offline Korreláció")
         self.notebook.grid(row=2, column=0, sticky="news")
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
+
+    def _on_tab_changed(self, event=None):
+        """Build lazy tabs on first selection; pause plot rendering while hidden."""
+        self._ensure_tab_built(self.notebook.nametowidget(self.notebook.select()))
+        plot_updater = getattr(self, 'plot_updater', None)
+        if plot_updater is not None and not self.headless:
+            # The headless plot is never on screen - keep exporting frames
+            plot_updater.set_visible(self.notebook.select() == str(self.tab_plot))
+
+    def _defer_tab_build(self, tab, builder):
+        """Show a placeholder in tab and run builder when the tab is first selected."""
+        self._tab_builders[tab] = builder
+        placeholder = ttk.Label(tab, text="Betöltés…")
+        placeholder.grid(row=0, column=0, padx=20, pady=20)
+        self._tab_placeholders[tab] = placeholder
+
+    def _ensure_tab_built(self, tab):
+        """Build a deferred tab now if it has not been built yet."""
+        builder = self._tab_builders.pop(tab, None)
+        if builder is None:
+            return
+        self._tab_placeholders.pop(tab).destroy()
+        builder()
 
     def _build_plot_frame(self):
         """Create plot frame inside the first tab only."""
@@ -440,19 +722,32 @@ class App:
 
     def _build_plot_tab(self):
         """Build the plot tab with controls and live counters."""
-        # Create matplotlib figure
-        fig, ax = plt.subplots(figsize=(8, 8))
+        from matplotlib.figure import Figure
+        
+        # Create matplotlib figure (small backing store - Tk scales the widget)
+        # Plain Figure, not registered with pyplot's global figure manager
+        fig = Figure(figsize=(5, 5), dpi=72)
+        ax = fig.add_subplot(111)
         ax.set_title('Koincidencia mérés')
         ax.set_xlabel('Adat')
         ax.set_ylabel('Beütések')
-        ax.set_xticks(range(0, 20))
+        ax.set_xticks(range(0, 20, 2))
+        ax.tick_params(labelsize=8)
+        for side in ('top', 'right'):
+            ax.spines[side].set_visible(False)
         ax.set_ylim([0, 4000])
         ax.set_facecolor(self.bg_color)
         ax.grid(color=self.highlight_color)
 
-        canvas = FigureCanvasTkAgg(fig, master=self.plot_frame)
-        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
-        canvas.get_tk_widget().config(background='white')
+        if self.headless:
+            # Off-screen canvas - every rendered frame is written to plot_out
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            canvas = FigureCanvasAgg(fig)
+        else:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            canvas = FigureCanvasTkAgg(fig, master=self.plot_frame)
+            canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+            canvas.get_tk_widget().config(background='white')
 
         # Create plot updater
         self.plot_updater = PlotUpdater(
@@ -462,6 +757,13 @@ class App:
             peer_connection=self.peer_connection,
             app_ref=self
         )
+        if self.headless:
+            # Frames are drawn by the update thread and exported as images
+            self.plot_updater.plot_out = self.plot_out
+            logger.info("Headless plot: writing frames to %s", self.plot_out)
+        else:
+            # Draw on the Tk thread; the off-screen headless canvas has no event loop
+            self.plot_updater.start_animation()
         
         # Initialize peer command handlers (for counter sync, optimization control, etc.)
         if self.peer_connection:
@@ -473,27 +775,29 @@ class App:
         
         # Initialize file transfer manager
         if self.peer_connection:
-            self.file_transfer_manager = FileTransferManager(
+            # Worker threads post status lines through one virtual event
+            self._transfer_status_latest = None
+            self._transfer_status_posted = False
+            self.root.bind('<<TransferStatus>>', self._drain_transfer_status)
+            ftm = FileTransferManager(
                 peer_connection=self.peer_connection,
                 plot_updater=self.plot_updater,
-                status_callback=self._update_transfer_status
+                status_callback=self._post_transfer_status
             )
+            self.file_transfer_manager = ftm
+            self._add_cleanup("stopping file transfer worker", ftm.stop)
             
-            # Register file transfer command handlers (chunked transfer)
-            self.peer_connection.register_command_handler('FILE_TRANSFER_REQUEST', 
-                                                         self.file_transfer_manager.handle_transfer_request)
-            self.peer_connection.register_command_handler('FILE_TRANSFER_START', 
-                                                         self.file_transfer_manager.handle_transfer_start)
-            self.peer_connection.register_command_handler('FILE_TRANSFER_CHUNK', 
-                                                         self.file_transfer_manager.handle_transfer_chunk)
-            self.peer_connection.register_command_handler('FILE_TRANSFER_END', 
-                                                         self.file_transfer_manager.handle_transfer_end)
-            self.peer_connection.register_command_handler('FILE_TRANSFER_DATA', 
-                                                         self.file_transfer_manager.handle_transfer_data)
-            self.peer_connection.register_command_handler('FILE_TRANSFER_COMPLETE', 
-                                                         self.file_transfer_manager.handle_transfer_complete)
-            self.peer_connection.register_command_handler('FILE_CHUNK_ACK',
-                                                         self.file_transfer_manager.handle_chunk_ack)
+            # Register file transfer command handlers (chunked transfer). The
+            # sender side already runs in its own thread; incoming file data
+            # and the final COMPLETE are handled in arrival order on the
+            # manager's receive worker, so COMPLETE follows the last write.
+            self.peer_connection.register_command_handler('FILE_TRANSFER_REQUEST', ftm.handle_transfer_request)
+            self.peer_connection.register_command_handler('FILE_TRANSFER_START', ftm.queued(ftm.handle_transfer_start))
+            self.peer_connection.register_command_handler('FILE_TRANSFER_CHUNK', ftm.queued(ftm.handle_transfer_chunk))
+            self.peer_connection.register_command_handler('FILE_TRANSFER_END', ftm.queued(ftm.handle_transfer_end))
+            self.peer_connection.register_command_handler('FILE_TRANSFER_DATA', ftm.queued(ftm.handle_transfer_data))
+            self.peer_connection.register_command_handler('FILE_TRANSFER_COMPLETE', ftm.queued(ftm.handle_transfer_complete))
+            self.peer_connection.register_command_handler('FILE_CHUNK_ACK', ftm.handle_chunk_ack)
         else:
             self.file_transfer_manager = None
 
@@ -543,6 +847,14 @@ class App:
                                    not self.plot_updater.normalize_plot)
         )
         cb_norm.grid(row=1, column=1, sticky="news", pady=4)
+        
+        # Redraw throttle: data keeps accumulating, the plot is drawn every Nth frame
+        tk.Label(controls, text="Redraw every:").grid(row=1, column=3, sticky="e", padx=(10, 2))
+        self.disp_skip_var = tk.IntVar(value=self.plot_updater.disp_skip)
+        tk.Spinbox(
+            controls, from_=1, to=10, width=4, state="readonly", textvariable=self.disp_skip_var,
+            command=lambda: setattr(self.plot_updater, 'disp_skip', self.disp_skip_var.get())
+        ).grid(row=1, column=4, sticky="w", padx=2)
 
     def _build_correlation_pair_selector(self):
         """Build UI for selecting correlation pairs with per-pair calibrate buttons."""
@@ -661,7 +973,7 @@ class App:
                     self.pair_rows_frame, text="🔬 Calibrate",
                     background='#9C27B0', foreground='white',
                     font=('Arial', 8, 'bold'), width=10,
-                    command=lambda idx=ofs_idx: self._start_live_calibration(idx),
+                    command=partial(self._start_live_calibration, ofs_idx),
                 )
                 btn.grid(row=row_i, column=3, padx=2, pady=1)
                 self._calibrate_buttons[ofs_idx] = btn
@@ -719,8 +1031,6 @@ class App:
         Data is accumulated for CALIBRATION_DURATION_SEC seconds,
         then the FFT is computed.
         """
-        import threading
-
         # Check streaming is active
         if not hasattr(self, 'plot_updater') or not self.plot_updater.streaming_active:
             if offset_idx in self._calibration_status_labels:
@@ -763,7 +1073,7 @@ class App:
                 import gui_components.config as _cfg_mod
                 importlib.reload(_cfg_mod)
                 cal_duration = _cfg_mod.CALIBRATION_DURATION_SEC
-                logger.info(f"Calibration[Offset {offset_idx+1}]: duration reloaded = {cal_duration}s")
+                logger.info("Calibration[Offset %d]: duration reloaded = %ss", offset_idx + 1, cal_duration)
 
                 # --- Phase 1: Accumulate data ---
                 # Clear the relevant buffers so we get fresh data only
@@ -771,8 +1081,8 @@ class App:
                 bufs_b = self.plot_updater.local_buffers if src_b == "L" else self.plot_updater.remote_buffers
                 bufs_a[ch_a].clear()
                 bufs_b[ch_b].clear()
-                logger.info(f"Calibration[Offset {offset_idx+1}]: Cleared buffers, "
-                           f"accumulating {cal_duration}s of data…")
+                logger.info("Calibration[Offset %d]: Cleared buffers, "
+                            "accumulating %ss of data…", offset_idx + 1, cal_duration)
 
                 # Wait, updating countdown on UI
                 for elapsed in range(cal_duration):
@@ -788,7 +1098,8 @@ class App:
                             text=f"Accumulating data… {d - r}/{d}s",
                             foreground='#1565C0')
                     ))
-                    time.sleep(1)
+                    if self._shutdown.wait(1):
+                        return  # Application closing
 
                 # --- Phase 2: Snapshot buffers and run FFT ---
                 self.root.after(0, lambda: (
@@ -800,8 +1111,8 @@ class App:
                 ts_a = bufs_a[ch_a].get_timestamps()
                 ts_b = bufs_b[ch_b].get_timestamps()
 
-                logger.info(f"Calibration[Offset {offset_idx+1}]: Snapshots — "
-                           f"a={len(ts_a):,}, b={len(ts_b):,}")
+                logger.info("Calibration[Offset %d]: Snapshots — a=%d, b=%d",
+                            offset_idx + 1, len(ts_a), len(ts_b))
 
                 result: CalibrationResult = self._live_calibrator.calibrate_pair(ts_a, ts_b)
 
@@ -809,14 +1120,12 @@ class App:
                 self.root.after(0, lambda: self._apply_calibration_result(offset_idx, result))
 
             except Exception as e:
-                logger.error(f"Calibration failed for offset {offset_idx+1}: {e}", exc_info=True)
+                logger.error("Calibration failed for offset %d: %s", offset_idx + 1, e, exc_info=True)
                 self.root.after(0, lambda: self._apply_calibration_result(
                     offset_idx, CalibrationResult(success=False, message=str(e))))
 
-        thread = threading.Thread(target=_calibration_worker, daemon=True,
-                                  name=f"LiveCalibrate-Ofs{offset_idx+1}")
-        self._calibration_threads[offset_idx] = thread
-        thread.start()
+        self._calibration_threads[offset_idx] = self._start_worker(
+            _calibration_worker, name=f"LiveCalibrate-Ofs{offset_idx+1}")
 
     def _apply_calibration_result(self, offset_idx: int, result: CalibrationResult):
         """Apply a calibration result to the UI and app state (runs on main thread)."""
@@ -840,19 +1149,19 @@ class App:
                           f"{result.elapsed_sec:.1f}s")
             status_color = '#2E7D32'
 
-            logger.info(f"Calibration[Offset {offset_idx+1}]: SUCCESS — "
-                       f"{result.offset_ps:,} ps, {result.confidence}")
+            logger.info("Calibration[Offset %d]: SUCCESS — %d ps, %s",
+                        offset_idx + 1, result.offset_ps, result.confidence)
         elif result.success and not result.reliable:
             # Low confidence — show but don't auto-save
             status_text = (f"⚠️ {result.offset_ps:,} ps BUT {result.confidence} confidence "
                           f"({result.peak_sigma:.1f}σ) — not saved, retry?")
             status_color = '#F57C00'
-            logger.warning(f"Calibration[Offset {offset_idx+1}]: LOW CONFIDENCE — "
-                          f"{result.offset_ps:,} ps, {result.peak_sigma:.1f}σ")
+            logger.warning("Calibration[Offset %d]: LOW CONFIDENCE — %d ps, %.1fσ",
+                           offset_idx + 1, result.offset_ps, result.peak_sigma)
         else:
             status_text = f"❌ Failed: {result.message}"
             status_color = '#D32F2F'
-            logger.error(f"Calibration[Offset {offset_idx+1}]: FAILED — {result.message}")
+            logger.error("Calibration[Offset %d]: FAILED — %s", offset_idx + 1, result.message)
 
         if offset_idx in self._calibration_status_labels:
             self._calibration_status_labels[offset_idx].config(
@@ -877,6 +1186,7 @@ class App:
         
         self.offset_entries = []
         self.offset_status_labels = []
+        self._last_offset_state = [None] * 4  # (offset, updated) each label shows
         
         for i in range(4):
             row_base = 1 + i * 2  # rows 1,2 / 3,4 / 5,6 / 7,8
@@ -893,18 +1203,17 @@ class App:
                 entry.insert(0, str(self.time_offsets_ps[i]))
             
             # Save button
-            idx = i  # capture for lambda
             tk.Button(offset_frame, text=f"💾 Save", 
                      background='#2196F3', foreground='white',
                      font=('Arial', 9, 'bold'), width=8,
-                     command=lambda idx=idx: self._save_time_offset_ui(idx)
+                     command=partial(self._save_time_offset_ui, i)
             ).grid(row=row_base, column=2, padx=3)
             
             # Clear button
             tk.Button(offset_frame, text="🗑️", 
                      background='#FF9800', foreground='white',
                      font=('Arial', 9, 'bold'), width=4,
-                     command=lambda idx=idx: self._clear_time_offset_ui(idx)
+                     command=partial(self._clear_time_offset_ui, i)
             ).grid(row=row_base, column=3, padx=3)
             
             # Status label on next row
@@ -924,7 +1233,7 @@ class App:
                 logger.warning("No time offset value entered for offset %d", idx + 1)
                 return
             
-            offset_ps = int(float(value))
+            offset_ps = _parse_offset(value)
             
             self.time_offsets_ps[idx] = offset_ps
             self.time_offsets_updated[idx] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -946,82 +1255,92 @@ class App:
         logger.info("Offset %d cleared", idx + 1)
     
     def _update_time_offset_status(self):
-        """Update the time offset status display for all slots."""
+        """Update the time offset status display for slots whose value changed."""
+        if not hasattr(self, 'offset_status_labels'):
+            return
+        labels = self.offset_status_labels
+        offs = self.time_offsets_ps
+        ups = self.time_offsets_updated
+        shown = self._last_offset_state
         for i in range(4):
-            if not hasattr(self, 'offset_status_labels'):
-                return
-            if self.time_offsets_ps[i] is not None and self.time_offsets_updated[i]:
-                formatted = format_number(self.time_offsets_ps[i])
-                text = f"✅ Offset {i+1}: {formatted} ps | Updated: {self.time_offsets_updated[i]}"
-                self.offset_status_labels[i].config(text=text, foreground='#2E7D32')
+            state = (offs[i], ups[i])
+            if state == shown[i]:
+                continue
+            shown[i] = state
+            if offs[i] is not None and ups[i]:
+                text = f"✅ Offset {i+1}: {format_number(offs[i])} ps | Updated: {ups[i]}"
+                labels[i].config(text=text, foreground=_OFFSET_SET_COLOR)
             else:
-                self.offset_status_labels[i].config(text=f"⚠️ Offset {i+1} not configured", 
-                                                     foreground='#F57C00')
+                labels[i].config(text=f"⚠️ Offset {i+1} not configured",
+                                 foreground=_OFFSET_UNSET_COLOR)
 
     def _build_live_counters(self):
         """Build live detector counter display for local and remote."""
         # LOCAL COUNTERS
-        local_counters = tk.Frame(self.tab_plot_left, relief=tk.GROOVE, bd=2, width=250, background='#E8F5E9')
+        local_counters = tk.Frame(self.tab_plot_left, relief=tk.GROOVE, bd=2, width=250, **_LOCAL_KW)
         local_counters.grid(row=1, column=0, sticky="nws", pady=5, padx=(5, 2))
         
         role_label = "BME" if self.computer_role == "computer_b" else "Wigner"
         tk.Label(local_counters, text=f"🟢 LOCAL Detektorok ({role_label})", 
                 font=('Arial', 10, 'bold'), foreground='#2E7D32',
-                background='#E8F5E9', width=22, height=2).grid(
+                **_LOCAL_KW, width=22, height=2).grid(
             row=0, column=0, columnspan=4, sticky="news"
         )
 
         self.beutes_labels = []
+        self._beutes_vars = [tk.StringVar(value="0") for _ in range(4)]
         self.local_save_vars = []  # Checkbox variables for local channels
+        on_local_save = partial(self._debounce_save_change, self._on_local_save_changed)
         for i in range(4):
-            tk.Label(local_counters, text=f"{i+1}.", background='#E8F5E9').grid(row=1, column=i, sticky="news")
-            lbl = tk.Label(local_counters, text="0", width=10, background='#E8F5E9')
+            tk.Label(local_counters, text=f"{i+1}.", **_LOCAL_KW).grid(row=1, column=i, sticky="news")
+            lbl = tk.Label(local_counters, textvariable=self._beutes_vars[i], width=10, **_LOCAL_KW)
             lbl.grid(row=2, column=i, sticky="news")
             self.beutes_labels.append(lbl)
             
             # Add save-to-file checkbox (checked by default)
             save_var = tk.BooleanVar(value=True)
-            cb = tk.Checkbutton(local_counters, text='Save', variable=save_var, 
-                              background='#E8F5E9', font=('Arial', 8),
-                              command=lambda: self._on_local_save_changed())
+            cb = tk.Checkbutton(local_counters, variable=save_var, **_SAVE_CB_KW, **_LOCAL_KW,
+                              command=on_local_save)
             cb.grid(row=3, column=i, sticky="news")
             self.local_save_vars.append(save_var)
 
         # REMOTE COUNTERS (if peer connected)
         if self.peer_connection:
-            remote_counters = tk.Frame(self.tab_plot_left, relief=tk.GROOVE, bd=2, width=250, background='#E3F2FD')
+            remote_counters = tk.Frame(self.tab_plot_left, relief=tk.GROOVE, bd=2, width=250, **_REMOTE_KW)
             remote_counters.grid(row=1, column=1, sticky="nws", pady=5, padx=(2, 5))
+            self._remote_counters_frame = remote_counters
             
             remote_role = "Wigner" if self.computer_role == "computer_b" else "BME"
             tk.Label(remote_counters, text=f"🔵 REMOTE Detektorok ({remote_role})", 
                     font=('Arial', 10, 'bold'), foreground='#1565C0',
-                    background='#E3F2FD', width=22, height=2).grid(
+                    **_REMOTE_KW, width=22, height=2).grid(
                 row=0, column=0, columnspan=4, sticky="news"
             )
 
             self.remote_beutes_labels = []
+            self._remote_beutes_vars = [tk.StringVar(value="---") for _ in range(4)]
             self.remote_save_vars = []  # Checkbox variables for remote channels
+            on_remote_save = partial(self._debounce_save_change, self._on_remote_save_changed)
             for i in range(4):
-                tk.Label(remote_counters, text=f"{i+1}.", background='#E3F2FD').grid(row=1, column=i, sticky="news")
-                lbl = tk.Label(remote_counters, text="---", width=10, background='#E3F2FD')
+                tk.Label(remote_counters, text=f"{i+1}.", **_REMOTE_KW).grid(row=1, column=i, sticky="news")
+                lbl = tk.Label(remote_counters, textvariable=self._remote_beutes_vars[i], width=10, **_REMOTE_KW)
                 lbl.grid(row=2, column=i, sticky="news")
                 self.remote_beutes_labels.append(lbl)
                 
                 # Add save-to-file checkbox (checked by default)
                 save_var = tk.BooleanVar(value=True)
-                cb = tk.Checkbutton(remote_counters, text='Save', variable=save_var,
-                                  background='#E3F2FD', font=('Arial', 8),
-                                  command=lambda: self._on_remote_save_changed())
+                cb = tk.Checkbutton(remote_counters, variable=save_var, **_SAVE_CB_KW, **_REMOTE_KW,
+                                  command=on_remote_save)
                 cb.grid(row=3, column=i, sticky="news")
                 self.remote_save_vars.append(save_var)
             
             # File transfer controls
-            transfer_frame = tk.Frame(remote_counters, background='#E3F2FD')
+            transfer_frame = tk.Frame(remote_counters, **_REMOTE_KW)
             transfer_frame.grid(row=4, column=0, columnspan=4, sticky="ew", pady=(5, 5))
             
             self.auto_transfer_var = tk.BooleanVar(value=False)
             tk.Checkbutton(transfer_frame, text='Auto-transfer files after recording',
-                          variable=self.auto_transfer_var, background='#E3F2FD',
+                          variable=self.auto_transfer_var, **_REMOTE_KW,
                           font=('Arial', 8, 'bold')).pack(side=tk.TOP, pady=2)
             
             tk.Button(transfer_frame, text="📥 Request Remote Files",
@@ -1030,40 +1349,66 @@ class App:
                      command=self._request_remote_files).pack(side=tk.TOP, pady=2)
             
             self.transfer_status_label = tk.Label(transfer_frame, text="",
-                                                   background='#E3F2FD',
-                                                   font=('Arial', 8), foreground='#555')
+                                                   **_REMOTE_KW,
+                                                   font=_FONT_CELL, foreground='#555')
             self.transfer_status_label.pack(side=tk.TOP, pady=2)
         else:
+            self._remote_counters_frame = None
             self.remote_beutes_labels = []
+            self._remote_beutes_vars = []
             self.remote_save_vars = []
             self.auto_transfer_var = None
             self.transfer_status_label = None
 
         # Store remote counter values (received from peer)
         self.remote_beutes_szamok = [0, 0, 0, 0]
+        self._last_transfer_status = (None, None)  # (text, color) on the transfer label
+        
+        # Last values shown on the counter labels (None = never drawn)
+        self._last_beutes = [None] * 4
+        self._last_remote_beutes = [None] * 4
+        # Tcl names of the labels' text variables, so all changes go out in one call
+        self._beutes_var_names = [str(var) for var in self._beutes_vars]
+        self._remote_beutes_var_names = [str(var) for var in self._remote_beutes_vars]
         
         # Recording timer state
         self.recording_start_time = None
         self.recording_duration = None
+        self._recording_end_time = None
+        self._last_timer_secs = -1  # whole seconds currently shown in the countdown
         
         # Send initial save settings to peer
         self.root.after(1000, self._send_initial_save_settings)
+        self._save_flush_pending = set()  # save-change handlers with a send already scheduled
 
-        # Start periodic counter update
-        self._update_counters()
+        # Counters are pushed by PlotUpdater / the peer handler - no polling
+        self.plot_updater.on_counts_updated = lambda counts: self._schedule_counter_refresh()
+        self._counter_refresh_pending = False
+        self._schedule_counter_refresh()
 
     def _send_initial_save_settings(self):
         """Send initial local save settings to peer after startup."""
         if self.peer_connection and self.peer_connection.is_connected():
             self._on_local_save_changed()
     
+    def _debounce_save_change(self, handler):
+        """Run handler 150 ms after the first toggle, so a burst of clicks sends one update."""
+        if handler in self._save_flush_pending:
+            return  # Already scheduled - it reads the checkboxes when it runs
+        self._save_flush_pending.add(handler)
+        self.root.after(150, self._flush_save_change, handler)
+    
+    def _flush_save_change(self, handler):
+        self._save_flush_pending.discard(handler)
+        handler()
+    
     def _on_local_save_changed(self):
         """Called when local save checkboxes change - notify peer of our settings."""
         if not hasattr(self, 'local_save_vars'):
             return
         
         local_save_channels = [i+1 for i in range(4) if self.local_save_vars[i].get()]
-        logger.info(f"Local save settings changed: {local_save_channels}")
+        logger.info("Local save settings changed: %s", local_save_channels)
         
         # Notify peer of our save settings (they display this in their REMOTE checkboxes)
         if self.peer_connection and self.peer_connection.is_connected():
@@ -1072,7 +1417,7 @@ class App:
                     'save_channels': local_save_channels
                 })
             except Exception as e:
-                logger.error(f"Failed to send save settings to peer: {e}")
+                logger.error("Failed to send save settings to peer: %s", e)
     
     def _on_remote_save_changed(self):
         """Called when remote save checkboxes change - tell peer to change their settings."""
@@ -1080,7 +1425,7 @@ class App:
             return
         
         remote_save_channels = [i+1 for i in range(4) if self.remote_save_vars[i].get()]
-        logger.info(f"Remote save settings changed (will request peer to save): {remote_save_channels}")
+        logger.info("Remote save settings changed (will request peer to save): %s", remote_save_channels)
         
         # Send command to peer to update their LOCAL save settings
         if self.peer_connection and self.peer_connection.is_connected():
@@ -1089,9 +1434,9 @@ class App:
                 self.peer_connection.send_command('SAVE_SETTINGS_REQUEST', {
                     'save_channels': remote_save_channels
                 })
-                logger.info(f"Requested peer to update save settings: {remote_save_channels}")
+                logger.info("Requested peer to update save settings: %s", remote_save_channels)
             except Exception as e:
-                logger.error(f"Failed to send save settings request to peer: {e}")
+                logger.error("Failed to send save settings request to peer: %s", e)
         else:
             logger.warning("No peer connection - cannot change remote save settings")
     
@@ -1102,60 +1447,104 @@ class App:
         else:
             logger.error("File transfer manager not initialized")
     
+    def _post_transfer_status(self, text: str, color: str = 'black'):
+        """FileTransferManager status callback: called from worker threads, applied on the Tk loop.
+        
+        Only the newest line matters, so a burst of updates shares a single
+        <<TransferStatus>> event instead of queueing one timer per call.
+        """
+        self._transfer_status_latest = (text, color)
+        if self._transfer_status_posted:
+            return  # The pending event will pick up this line
+        self._transfer_status_posted = True
+        try:
+            self.root.event_generate('<<TransferStatus>>', when='tail')
+        except (RuntimeError, tk.TclError):
+            pass  # Tk main loop already gone (shutting down)
+    
+    def _drain_transfer_status(self, event=None):
+        # Clear the flag before reading so a line posted meanwhile raises a new event
+        self._transfer_status_posted = False
+        self._update_transfer_status(*self._transfer_status_latest)
+    
     def _update_transfer_status(self, text: str, color: str = 'black'):
         """Update transfer status label (callback for FileTransferManager)."""
         if hasattr(self, 'transfer_status_label') and self.transfer_status_label:
+            # Progress callbacks often repeat the same line - skip the Tk call then
+            key = (text, color)
+            if key == self._last_transfer_status:
+                return
+            self._last_transfer_status = key
             try:
                 self.transfer_status_label.config(text=text, foreground=color)
             except Exception:
                 pass
     
+    def _schedule_counter_refresh(self):
+        """Refresh the counter labels once on the Tk loop (safe from any thread)."""
+        if self._counter_refresh_pending:
+            return
+        self._counter_refresh_pending = True
+        try:
+            self.root.after(0, self._run_counter_refresh)
+        except RuntimeError:
+            pass  # Tk main loop gone (shutting down)
+    
+    def _run_counter_refresh(self):
+        self._counter_refresh_pending = False
+        self._update_counters()
+    
     def _update_counters(self):
-        """Periodically update counter labels from plot updater."""
+        """Update counter labels that changed since the last refresh."""
+        # Collect changed label variables and send them to Tcl as one script
+        cmds = []
+        fmt = format_number
+        
         # Update local counters
-        vals = getattr(self.plot_updater, 'beutes_szamok', [0, 0, 0, 0])
-        try:
-            for i in range(4):
-                if self.beutes_labels[i].winfo_exists():
-                    self.beutes_labels[i].config(text=format_number(vals[i]))
-        except Exception:
-            pass
+        vals = self.plot_updater.beutes_szamok
+        last = self._last_beutes
+        names = self._beutes_var_names
+        for i in range(4):
+            val = vals[i]
+            if val != last[i]:
+                cmds.append(f"set {names[i]} {{{fmt(val)}}}")
+                last[i] = val
         
         # Update remote counters
         if self.remote_beutes_labels:
-            try:
-                for i in range(4):
-                    if self.remote_beutes_labels[i].winfo_exists():
-                        if self.peer_connection and self.peer_connection.is_connected():
-                            self.remote_beutes_labels[i].config(text=format_number(self.remote_beutes_szamok[i]))
-                        else:
-                            self.remote_beutes_labels[i].config(text="---")
-            except Exception:
-                pass
+            peer = self.peer_connection
+            connected = peer and peer.is_connected()
+            vals = self.remote_beutes_szamok
+            last = self._last_remote_beutes
+            names = self._remote_beutes_var_names
+            for i in range(4):
+                val = vals[i] if connected else "---"
+                if val != last[i]:
+                    text = fmt(val) if connected else val
+                    cmds.append(f"set {names[i]} {{{text}}}")
+                    last[i] = val
         
-        if self.root.winfo_exists():
-            self._after_id = self.root.after(300, self._update_counters)
+        if cmds:
+            try:
+                self.root.tk.eval(";".join(cmds))
+            except tk.TclError:
+                pass  # Labels destroyed during shutdown
     
     def _update_recording_timer(self):
-        """Update recording timer countdown display."""
-        if not self.recording_start_time or not self.recording_duration:
+        """Update recording timer countdown display (shared UI timer, every 500 ms)."""
+        if not self._recording_end_time:
             return
         
-        elapsed = time.time() - self.recording_start_time
-        remaining = max(0, self.recording_duration - elapsed)
+        remaining = self._recording_end_time - time.time()
         
         if remaining > 0:
-            # Update display
-            mins = int(remaining // 60)
-            secs = int(remaining % 60)
-            self.recording_timer_label.config(
-                text=f"⏱️ Recording: {mins:02d}:{secs:02d}",
-                foreground='red'
-            )
-            
-            # Schedule next update
-            if self.root.winfo_exists():
-                self.root.after(100, self._update_recording_timer)
+            # Ticks run twice per second; the label only changes once per second
+            remaining_int = int(remaining)
+            if remaining_int != self._last_timer_secs:
+                self._last_timer_secs = remaining_int
+                mins, secs = divmod(remaining_int, 60)
+                self.recording_timer_label.config(
+                    text=f"⏱️ Recording: {mins:02d}:{secs:02d}", foreground='red')
         else:
             # Time's up! Auto-stop
             logger.info("Recording duration completed - auto-stopping")
@@ -1167,15 +1556,19 @@ class App:
 
 
     def _build_polarizer_tab(self):
-        """Build the polarization controller tab with optimizer rows."""
+        """Build the polarization controller tab with optimizer rows.
+        
+        Headers and frames are built right away; the eight optimizer rows are
+        created one per idle pass (see _build_next_optim_row) so the tab shows
+        up immediately and the main loop keeps pumping in between.
+        """
         # Main container with padding
         container = tk.Frame(self.tab_polarizer, background=self.primary_color)
         container.grid(row=0, column=0, sticky="nws", pady=5, padx=5)
         
         # Header
-        header = tk.Label(container, text="Polarizáció optimizálás", 
-                         width=120, height=2, font=('Arial', 12, 'bold'),
-                         background=self.primary_color, foreground=self.fg_color)
+        header = ttk.Label(container, text="Polarizáció optimizálás", 
+                           width=120, anchor=tk.CENTER, style='Header.TLabel')
         header.grid(row=0, column=0, sticky="ew", pady=(0, 10))
 
         # LOCAL GROUP FRAME
@@ -1183,78 +1576,108 @@ class App:
         local_frame.grid(row=1, column=0, sticky="ew", pady=(0, 10))
         
         # Local group header
-        tk.Label(local_frame, text="🟢 LOCAL DEVICES (This Computer)", 
-                font=('Arial', 11, 'bold'), foreground='#2E7D32', background='#E8F5E9').grid(
+        ttk.Label(local_frame, text="🟢 LOCAL DEVICES (This Computer)", 
+                  anchor=tk.CENTER, style='LocalTitle.TLabel').grid(
             row=0, column=0, columnspan=10, sticky="news", pady=(5, 5), padx=5
         )
         
-        # Column headers for local
-        headers = [
-            "Serial Number", "TC Ch", "Start [deg]", "Start Val",
-            "Angles [deg]", "Current Val", "Best [deg]", "Best Val",
-            "Status", "Actions"
-        ]
-        for j, h in enumerate(headers):
-            tk.Label(local_frame, text=h, font=('Arial', 9, 'bold'), 
-                    background='#E8F5E9').grid(row=1, column=j, padx=3, pady=3)
-
-        # Create 4 LOCAL optimizer rows (rows 0-3)
-        # Use appropriate serials based on computer role
-        local_serials = DEFAULT_LOCAL_SERIALS if self.computer_role == "computer_a" else DEFAULT_REMOTE_SERIALS
-        
-        for r in range(4):
-            default_serial, default_channel = local_serials[r] if r < len(local_serials) else (None, r + 1)
-            row = OptimizerRowExtended(
-                local_frame, r, self.tc_address, self.action_color,
-                is_remote=False,
-                peer_connection=self.peer_connection,
-                default_serial=default_serial,
-                default_channel=default_channel
-            )
-            self.optim_rows[r] = row
+        self._make_header_row(local_frame, 'LocalColumn.TLabel')
+        local_tree = self._build_optim_tree(local_frame)
 
         # REMOTE GROUP FRAME
         remote_frame = tk.Frame(container, relief=tk.RIDGE, bd=3, background='#E3F2FD')  # Light blue
         remote_frame.grid(row=2, column=0, sticky="ew", pady=(0, 10))
         
         # Remote group header
-        tk.Label(remote_frame, text="🔵 REMOTE DEVICES (Peer Computer)", 
-                font=('Arial', 11, 'bold'), foreground='#1565C0', background='#E3F2FD').grid(
+        ttk.Label(remote_frame, text="🔵 REMOTE DEVICES (Peer Computer)", 
+                  anchor=tk.CENTER, style='RemoteTitle.TLabel').grid(
             row=0, column=0, columnspan=10, sticky="news", pady=(5, 5), padx=5
         )
         
-        # Column headers for remote
-        for j, h in enumerate(headers):
-            tk.Label(remote_frame, text=h, font=('Arial', 9, 'bold'),
-                    background='#E3F2FD').grid(row=1, column=j, padx=3, pady=3)
+        self._make_header_row(remote_frame, 'RemoteColumn.TLabel')
+        remote_tree = self._build_optim_tree(remote_frame)
 
-        # Create 4 REMOTE optimizer rows (rows 4-7)
-        # Use opposite serials for remote (what the peer computer has)
-        remote_serials = DEFAULT_REMOTE_SERIALS if self.computer_role == "computer_a" else DEFAULT_LOCAL_SERIALS
-        
-        for r in range(4, 8):
-            local_idx = r - 4  # Map 4-7 to 0-3 for serial lookup
-            default_serial, default_channel = remote_serials[local_idx] if local_idx < len(remote_serials) else ("", r - 3)
-            
-            row = OptimizerRowExtended(
-                remote_frame, r, self.tc_address, self.action_color,
-                is_remote=True,
-                peer_connection=self.peer_connection,
-                default_serial=default_serial,
-                default_channel=default_channel
-            )
-            self.optim_rows[r] = row
+        # 4 LOCAL optimizer rows (rows 0-3), then 4 REMOTE rows (rows 4-7)
+        self._pending_optim_rows = (
+            [(local_frame, local_tree, r, False, self._local_defaults[r]) for r in range(4)]
+            + [(remote_frame, remote_tree, r, True, self._remote_defaults[r - 4]) for r in range(4, 8)]
+        )
+        self._rows_loading_label = ttk.Label(container)
+        self._rows_loading_label.grid(row=3, column=0, sticky="w")
+        self._update_rows_loading_label()
+        self.root.after_idle(self._build_next_optim_row)
 
         # Build bulk controls
         self._build_bulk_controls()
 
+    def _build_next_optim_row(self):
+        """Create one pending optimizer row and schedule the next one."""
+        if not self._pending_optim_rows or self._shutdown.is_set():
+            return
+        self._create_optim_row(*self._pending_optim_rows.pop(0))
+        self._update_rows_loading_label()
+        if self._pending_optim_rows:
+            self.root.after_idle(self._build_next_optim_row)
+
+    def _ensure_optim_rows(self):
+        """Build the polarizer tab and all of its rows now (peer commands need them)."""
+        self._ensure_tab_built(self.tab_polarizer)
+        while self._pending_optim_rows:
+            self._create_optim_row(*self._pending_optim_rows.pop(0))
+        self._update_rows_loading_label()
+
+    def _create_optim_row(self, frame, tree, r, is_remote, defaults):
+        """Create optimizer row r in its group frame."""
+        default_serial, default_channel = defaults
+        self.optim_rows[r] = OptimizerRowExtended(
+            frame, tree, r, self.tc_address, self.action_color,
+            is_remote=is_remote,
+            peer_connection=self.peer_connection,
+            default_serial=default_serial,
+            default_channel=default_channel
+        )
+
+    def _update_rows_loading_label(self):
+        """Show how many optimizer rows are still being built; remove when done."""
+        if self._rows_loading_label is None:
+            return
+        if self._pending_optim_rows:
+            self._rows_loading_label.config(
+                text=f"Sorok betöltése… {len(self._pending_optim_rows)}")
+        else:
+            self._rows_loading_label.destroy()
+            self._rows_loading_label = None
+
+    @staticmethod
+    def _pad_serials(serials, blank_serial):
+        """Return exactly 4 (serial, channel) defaults, filling gaps with (blank, channel)."""
+        return [serials[i] if i < len(serials) else (blank_serial, i + 1) for i in range(4)]
+
+    def _make_header_row(self, frame, style):
+        """Grid the input-column headers above a group's optimizer rows."""
+        for j, h in enumerate(OPTIM_INPUT_HEADERS):
+            ttk.Label(frame, text=h, style=style).grid(row=1, column=j, padx=3, pady=3)
+
+    def _build_optim_tree(self, frame):
+        """Create the Treeview holding one group's optimizer display values."""
+        tree = ttk.Treeview(frame, columns=[c[0] for c in OPTIM_DISPLAY_COLUMNS],
+                            show='headings', height=4, selectmode='none',
+                            style='Optim.Treeview')
+        for col, text, width in OPTIM_DISPLAY_COLUMNS:
+            tree.heading(col, text=text)
+            tree.column(col, width=width, anchor=tk.CENTER, stretch=False)
+        tree.tag_configure('remote', foreground='blue')
+        # Header row plus the four row slots (rows 2..9 depending on group)
+        tree.grid(row=1, column=3, rowspan=9, sticky="nw", padx=(6, 3), pady=3)
+        return tree
+
     def _build_bulk_controls(self):
         """Build bulk control buttons for all optimizer rows."""
         bulk = tk.Frame(self.tab_polarizer, relief=tk.GROOVE, bd=2, width=800)
         bulk.grid(row=1, column=0, sticky="nws", pady=5)
         
         # Local controls
-        tk.Label(bulk, text="LOCAL:", font=('Arial', 9, 'bold'), foreground='green').grid(
+        ttk.Label(bulk, text="LOCAL:", style='LocalBulk.TLabel').grid(
             row=0, column=0, padx=(10, 5), sticky=tk.W
         )
         tk.Button(
@@ -1268,7 +1691,7 @@ class App:
         ).grid(row=0, column=2, padx=4)
         
         # Remote controls
-        tk.Label(bulk, text="REMOTE:", font=('Arial', 9, 'bold'), foreground='blue').grid(
+        ttk.Label(bulk, text="REMOTE:", style='RemoteBulk.TLabel').grid(
             row=1, column=0, padx=(10, 5), sticky=tk.W
         )
         tk.Button(
@@ -1283,10 +1706,10 @@ class App:
         
         # Single row selector
         tk.Label(bulk, text="Row (1-8):").grid(row=0, column=3, padx=(20, 2))
-        self.sel_var = tk.StringVar(value="1")
-        sel_combo = ttk.Combobox(bulk, values=["1", "2", "3", "4", "5", "6", "7", "8"], 
-                                width=4, state="readonly", textvariable=self.sel_var)
-        sel_combo.grid(row=0, column=4, padx=2)
+        self.sel_var = tk.IntVar(value=1)
+        sel_spin = tk.Spinbox(bulk, from_=1, to=8, width=4, state="readonly",
+                              textvariable=self.sel_var)
+        sel_spin.grid(row=0, column=4, padx=2)
         
         # Optimize one button
         tk.Button(
@@ -1309,32 +1732,52 @@ class App:
                 row._on_stop()
 
     def _optimize_all_remote(self):
-        """Start optimization for all remote rows (4-7)."""
-        for i in range(4, 8):
-            row = self.optim_rows.get(i)
-            if row and row.has_serial():
-                row._on_start()
+        """Start optimization for all remote rows (4-7) with one batched command."""
+        rows = [self.optim_rows.get(i) for i in range(4, 8)]
+        rows = [row for row in rows if row and row.has_serial()]
+        if not rows:
+            return
+        for row in rows:
+            row.mark_started()
+        items = [row.remote_start_payload() for row in rows]
+        peer = self.peer_connection
+        
+        def send():
+            # A slow peer may block for up to SEND_TIMEOUT - keep that off the Tk thread
+            success = peer is not None and peer.send_command('OPTIMIZE_START_BATCH', {'items': items})
+            try:
+                self.root.after(0, self._on_remote_start_sent, rows, success)
+            except RuntimeError:
+                pass  # Tk main loop already gone (shutting down)
+        
+        self._start_worker(send, name="OptimizeStartBatch")
+    
+    def _on_remote_start_sent(self, rows, success: bool):
+        for row in rows:
+            row.remote_start_sent(success)
 
     def _stop_all_remote(self):
-        """Stop optimization for all remote rows (4-7)."""
-        for i in range(4, 8):
-            row = self.optim_rows.get(i)
-            if row:
-                row._on_stop()
+        """Stop optimization for all remote rows (4-7) with one batched command."""
+        rows = [row for row in (self.optim_rows.get(i) for i in range(4, 8)) if row]
+        for row in rows:
+            row.set_status("Leállítás...")
+        peer = self.peer_connection
+        if rows and peer is not None and peer.is_connected():
+            items = [{'row_index': row.row_idx} for row in rows]
+            self._start_worker(lambda: peer.send_command('OPTIMIZE_STOP_BATCH', {'items': items}),
+                               name="OptimizeStopBatch")
 
     def _optimize_one(self):
         """Start optimization for selected row (1-8)."""
-        try:
-            idx = max(0, min(7, int(self.sel_var.get()) - 1))
-        except Exception:
-            idx = 0
+        # Readonly spinbox only ever holds 1..8
+        idx = self.sel_var.get() - 1
         
         row = self.optim_rows.get(idx)
         if row and row.has_serial():
             row._on_start()
         elif row:
             try:
-                row.status_lbl.config(text="Hiányzó serial/nincs kapcsolat")
+                row.set_status("Hiányzó serial/nincs kapcsolat")
             except Exception:
                 pass
 
@@ -1342,6 +1785,7 @@ class App:
     
     def _build_time_offset_tab(self):
         """Build the time offset calculator tab."""
+        from gui_components.time_offset_tab import TimeOffsetTab
         self.time_offset_tab_component = TimeOffsetTab(
             self.tab_time_offset,
             app_ref=self,
@@ -1349,9 +1793,11 @@ class App:
             fg_color=self.fg_color,
             action_color=self.action_color
         )
+        self._figures.append(self.time_offset_tab_component.fig)
 
     def _build_offline_correlation_tab(self):
         """Build the offline correlation analysis tab."""
+        from gui_components.offline_correlation_tab import OfflineCorrelationTab
         self.offline_correlation_tab_component = OfflineCorrelationTab(
             self.tab_offline_correlation,
             app_ref=self,
@@ -1359,63 +1805,108 @@ class App:
             fg_color=self.fg_color,
             action_color=self.action_color
         )
+        self._figures.append(self.offline_correlation_tab_component.fig)
 
-    def _on_close(self):
-        """Handle window close event with proper cleanup."""
-        logger.info("Closing application...")
-        
-        # Stop background updater loop
-        try:
-            if hasattr(self, 'plot_updater'):
-                self.plot_updater.stop()
-        except Exception:
-            pass
-        
-        # Cancel scheduled UI updates
-        try:
-            if self._after_id is not None:
-                self.root.after_cancel(self._after_id)
-                self._after_id = None
-        except Exception:
-            pass
-        
-        # Cleanup per-row optimizer resources (all 8 rows)
-        try:
-            for i in list(getattr(self, 'optim_rows', {}).keys()):
-                row = self.optim_rows[i]
-                try:
-                    row.cleanup()
-                except Exception:
-                    pass
-        except Exception:
-            pass
-        
-        # Close peer connection
-        try:
-            if hasattr(self, 'peer_connection') and self.peer_connection is not None:
-                logger.info("Closing peer connection...")
-                self.peer_connection.close()
-        except Exception as e:
-            logger.exception("Error closing peer connection: %s", e)
+    def _add_cleanup(self, what: str, func):
+        """Register a shutdown step; failures are logged and do not stop later steps."""
+        def step():
+            t0 = time.perf_counter()
+            try:
+                func()
+            except Exception as e:
+                logger.error("Error %s: %s", what, e)
+            logger.debug("Shutdown: %s took %.1f ms", what, (time.perf_counter() - t0) * 1000)
+        self._exit_stack.callback(step)
+    
+    def _start_worker(self, target, name: str) -> threading.Thread:
+        """Start a daemon worker thread that _on_close will join."""
+        self._threads = [t for t in self._threads if t.is_alive()]
+        thread = threading.Thread(target=target, daemon=True, name=name)
+        self._threads.append(thread)
+        thread.start()
+        return thread
+    
+    def _join_threads(self, timeout: float = 2.0):
+        """Join app and optimizer worker threads, sharing one overall deadline."""
+        threads = list(self._threads)
+        threads += [row.thread for row in self.__dict__.get('optim_rows', {}).values() if row.thread]
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            if thread.is_alive() and thread is not threading.current_thread():
+                thread.join(max(0.0, deadline - time.monotonic()))
+                if thread.is_alive():
+                    logger.warning("Thread %s did not stop before shutdown", thread.name)
+    
+    @staticmethod
+    def _run_parallel(steps, timeout: float):
+        """Run independent (description, func) shutdown steps concurrently.
         
-        # Close Time Controller socket
+        Waits at most timeout seconds; a step that hangs is logged and not
+        waited for, so it does not hold up the remaining shutdown steps.
+        """
+        executor = ThreadPoolExecutor(max_workers=len(steps), thread_name_prefix="shutdown")
+        futures = {executor.submit(func): what for what, func in steps}
+        done, not_done = wait(futures, timeout=timeout)
+        for future in done:
+            if future.exception() is not None:
+                logger.error("Error %s: %s", futures[future], future.exception())
+        for future in not_done:
+            logger.warning("Timed out %s", futures[future])
+        executor.shutdown(wait=False)
+    
+    def _close_connections(self):
+        """Close the peer connection and the Time Controller socket in parallel."""
+        self._run_parallel([
+            ("closing peer connection", self._close_peer_connection),
+            ("closing Time Controller", self._close_time_controller),
+        ], timeout=2.0)
+    
+    def _close_pyplot_figures(self):
+        """Close the figures our tabs created through pyplot, newest first."""
+        plt = sys.modules.get('matplotlib.pyplot')
+        if plt is None:
+            return
+        for fig in reversed(self._figures):
+            try:
+                plt.close(fig)
+            except Exception:
+                pass
+    
+    def _cancel_ticks(self):
+        """Stop the shared UI timer."""
+        self._tickers = []
+        if self._tick_id is not None:
+            self.root.after_cancel(self._tick_id)
+            self._tick_id = None
+    
+    def _cleanup_optim_rows(self):
+        """Cleanup per-row optimizer resources (all 8 rows, in parallel)."""
+        if self.optim_rows:
+            self._run_parallel([(f"cleaning up optimizer row {idx + 1}", row.cleanup)
+                                for idx, row in self.optim_rows.items()], timeout=1.5)
+    
+    def _close_peer_connection(self):
+        """Close the peer connection if one is (still) configured."""
+        if self.peer_connection is not None:
+            logger.info("Closing peer connection...")
+            self.peer_connection.close()
+    
+    def _close_time_controller(self):
+        """Close Time Controller socket."""
+        if self.tc is None:
+            return
         try:
-            if hasattr(self, 'tc') and self.tc is not None:
-                try:
-                    self.tc.close(0)
-                except Exception:
-                    try:
-                        self.tc.close()
-                    except Exception:
-                        pass
+            self.tc.close(0)
         except Exception:
-            pass
+            self.tc.close()
+    
+    def _on_close(self):
+        """Handle window close event with proper cleanup."""
+        logger.info("Closing application...")
         
-        # Close matplotlib figures
-        try:
-            plt.close('all')
-        except Exception:
-            pass
+        # Tell workers to stop before the shutdown steps start tearing things down
+        self._shutdown.set()
+        self._exit_stack.close()
         
         # Ensure Tk loop exits then destroy window
         try:
@@ -1426,9 +1917,24 @@ class App:
         
         logger.info("Application closed")
 
-
 def main():
     """Main entry point for the application."""
+    parser = argparse.ArgumentParser(description="MPC320 Peer-to-Peer Control Application")
+    parser.add_argument('--headless', action='store_true',
+                        help="Render the coincidence plot off-screen with the Agg backend and "
+                             "write each frame to --plot-out. The Tk control window is still "
+                             "shown, so a display (or e.g. Xvfb) is required.")
+    parser.add_argument('--plot-out', metavar='PATH',
+                        help="Image file rewritten with every headless plot frame "
+                             "(default: coincidence_plot.png; format from the extension)")
+    args = parser.parse_args()
+    if args.plot_out and not args.headless:
+        parser.error("--plot-out requires --headless")
+    if args.headless and not args.plot_out:
+        args.plot_out = 'coincidence_plot.png'
+    if args.headless:
+        matplotlib.use('Agg')
+    
     # Always use INFO level logging (DEBUG_MODE only controls explicit if-statements in code)
     from gui_components.config import DEBUG_MODE
     log_level = logging.INFO
@@ -1450,7 +1956,7 @@ def main():
     logger.info("Starting MPC320 Peer-to-Peer Control Application")
     
     root = tk.Tk()
-    app = App(root)
+    app = App(root, headless=args.headless, plot_out=args.plot_out)
     root.mainloop()
 
 
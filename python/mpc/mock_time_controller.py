@@ -357,6 +357,13 @@ def safe_acquire_histograms(tc, duration, bin_width, bin_count, histograms, acqu
         base_seed = 1000000 + ref_second
         result = {}
         
+        # Gaussian peak profile over offsets -peak_width..peak_width-1, truncated
+        # to counts - computed once and added as a slice per peak
+        peak_width = 10
+        peak_height = 100
+        offsets = np.arange(-peak_width, peak_width)
+        peak_kernel = (peak_height * np.exp(-(offsets ** 2) / (2 * (peak_width / 3) ** 2))).astype(np.int32)
+        
         for hist_id in histograms:
             # Determine correlation seed based on mode
             if MOCK_CORRELATION_MODE == 'cross_site':
@@ -377,17 +384,14 @@ def safe_acquire_histograms(tc, duration, bin_width, bin_count, histograms, acqu
             peak_positions = np.random.randint(bin_count // 4, 3 * bin_count // 4, num_peaks)
             
             for peak_pos in peak_positions:
-                peak_width = 10
-                peak_height = 100
-                for i in range(max(0, peak_pos - peak_width), min(bin_count, peak_pos + peak_width)):
-                    distance = abs(i - peak_pos)
-                    gaussian = peak_height * np.exp(-(distance ** 2) / (2 * (peak_width / 3) ** 2))
-                    histogram[i] += int(gaussian)
+                start = peak_pos - peak_width
+                lo = max(0, start)
+                hi = min(bin_count, peak_pos + peak_width)
+                histogram[lo:hi] += peak_kernel[lo - start:hi - start]
             
             # Add channel-specific noise
             np.random.seed(corr_seed + hist_id * 10)
-            noise = np.random.poisson(5, bin_count).astype(np.int32)
-            histogram = histogram + noise
+            histogram += np.random.poisson(5, bin_count).astype(np.int32)
             
             result[hist_id] = histogram
         
@@ -5,7 +5,8 @@ import threading
 import json
 import logging
 import time
-from typing import Optional, Callable, Dict, Any
+from collections import deque
+from typing import Optional, Callable, Dict, Any, List
 from secure_channel import SecureChannel
 from gui_components.config import DEBUG_MODE
 
@@ -19,7 +20,24 @@ CONNECTION_TIMEOUT = 10.0  # seconds
 HANDSHAKE_TIMEOUT = 30.0  # seconds - longer for real network conditions
 SEND_TIMEOUT = 10.0  # seconds - socket send timeout for individual operations
 SEND_TIMEOUT_LARGE = 60.0  # seconds - extended timeout for large payloads (file chunks)
-SOCKET_BUF_SIZE = 1048576  # 1 MB socket send/receive buffer
+SOCKET_BUF_SIZE = 8 * 1024 * 1024  # 8 MB socket send/receive buffer (file transfers)
+BATCH_DELAY = 0.05  # seconds - small commands sent with send_command_batched wait this long
+BATCH_MAX_COMMANDS = 64  # flush immediately once this many commands are queued
+
+# Optional wire features, announced in the PUBLIC_KEY handshake message.
+# Peers that predate this list announce nothing and get the legacy formats.
+#   ref_u32: TIMESTAMP_BATCH reference seconds may be sent as uint32
+CAPABILITIES = ('ref_u32',)
+
+
+def _configure_socket(sock: socket.socket):
+    """Tune a peer socket: keepalive, no Nagle delay, large buffers, quick ACKs (Linux)."""
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUF_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUF_SIZE)
+    if hasattr(socket, 'TCP_QUICKACK'):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
 
 
 class PeerConnection:
@@ -61,31 +79,67 @@ class PeerConnection:
         self.heartbeat_thread: Optional[threading.Thread] = None
         self.stop_event = threading.Event()
         
+        # Outgoing writes (one frame at a time) and coalesced small commands
+        self._send_lock = threading.Lock()
+        self._batch = deque()
+        self._batch_lock = threading.Lock()
+        self._batch_timer: Optional[threading.Timer] = None
+        
         # Message handling
         self.command_handlers: Dict[str, Callable] = {}
+        self.state_change_callbacks: List[Callable[[bool], None]] = []
+        self.state_version = 0  # Incremented on every connect/disconnect transition
+        self.peer_capabilities = frozenset()  # Set from the peer's PUBLIC_KEY message
         self.last_heartbeat = time.time()
         
         if DEBUG_MODE:
             logger.info("PeerConnection initialized: mode=%s, server_ip=%s, port=%d (encrypted)", mode, server_ip, port)
     
+    def peer_supports(self, capability: str) -> bool:
+        """True if the connected peer announced capability (see CAPABILITIES)."""
+        return capability in self.peer_capabilities
+    
     def register_command_handler(self, command: str, handler: Callable):
         """Register a handler function for a specific command type."""
         self.command_handlers[command] = handler
     
-    def start(self) -> bool:
+    def on_state_change(self, callback: Callable[[bool], None]):
+        """Register a callback invoked with the new state whenever `connected` flips.
+        
+        Callbacks run on whichever thread changed the state (server, receiver
+        or heartbeat thread), so GUI callers must marshal onto their own loop.
+        """
+        self.state_change_callbacks.append(callback)
+    
+    def _set_connected(self, connected: bool):
+        """Update connection state and notify listeners on transitions."""
+        if self.connected == connected:
+            return
+        self.connected = connected
+        self.state_version += 1
+        for callback in list(self.state_change_callbacks):
+            try:
+                callback(connected)
+            except Exception as e:
+                logger.error("State change callback error: %s", e)
+    
+    def start(self, retries: int = 3) -> bool:
         """
         Start connection based on mode.
         
         For server mode: Start listening for incoming connection
         For client mode: Connect to server
         
+        Args:
+            retries: Connect attempts in client mode (ignored by the server)
+        
         Returns:
             bool: True if started successfully
         """
         if self.mode == "server":
             return self._start_server()
         else:
-            return self._connect_to_server()
+            return self._connect_to_server(retries=retries)
     
     def _start_server(self) -> bool:
         """Start listening for incoming peer connections (server mode only)."""
@@ -93,6 +147,8 @@ class PeerConnection:
             self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            # Accepted sockets inherit the receive buffer (and so the window scale) from here
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUF_SIZE)
             self.server_socket.bind((self.server_ip, self.port))
             self.server_socket.listen(1)
             self.server_socket.settimeout(1.0)  # Non-blocking accept
@@ -114,11 +170,6 @@ class PeerConnection:
         try:
             message = json.dumps(data) + '\n'
             self.peer_socket.sendall(message.encode('utf-8'))
-            # Disable Nagle's algorithm to send immediately
-            try:
-                self.peer_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-            except:
-                pass  # May already be set
             if DEBUG_MODE:
                 logger.info("Sent %s message (%d bytes)", data.get('type', 'UNKNOWN'), len(message))
             return True
@@ -163,11 +214,13 @@ class PeerConnection:
                 return False
             
             self.secure_channel.set_peer_public_key(msg['public_key'])
+            self.peer_capabilities = frozenset(msg.get('capabilities', ()))
             
             # Step 2: Send our public key
             self._send_raw({
                 'type': 'PUBLIC_KEY',
-                'public_key': self.secure_channel.get_public_key_pem()
+                'public_key': self.secure_channel.get_public_key_pem(),
+                'capabilities': list(CAPABILITIES)
             })
             
             # Step 3: Generate and send encrypted session key
@@ -213,7 +266,8 @@ class PeerConnection:
             # Step 1: Send our public key
             self._send_raw({
                 'type': 'PUBLIC_KEY',
-                'public_key': self.secure_channel.get_public_key_pem()
+                'public_key': self.secure_channel.get_public_key_pem(),
+                'capabilities': list(CAPABILITIES)
             })
             if DEBUG_MODE:
                 logger.info("Sent client public key")
@@ -224,6 +278,7 @@ class PeerConnection:
                 return False
             
             self.secure_channel.set_peer_public_key(msg['public_key'])
+            self.peer_capabilities = frozenset(msg.get('capabilities', ()))
             if DEBUG_MODE:
                 logger.info("Received server public key")
             
@@ -283,10 +338,8 @@ class PeerConnection:
                     logger.info("Connecting to server at %s:%d (attempt %d/%d)", 
                                self.server_ip, self.port, attempt + 1, retries)
                 self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                self.client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
-                self.client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-                self.client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUF_SIZE)
-                self.client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUF_SIZE)
+                # Before connect() so the window scale is negotiated for the big buffers
+                _configure_socket(self.client_socket)
                 self.client_socket.settimeout(timeout)
                 
                 # Connect to server
@@ -294,12 +347,12 @@ class PeerConnection:
                 
                 self.peer_socket = self.client_socket
                 self.peer_ip = self.server_ip
-                self.connected = True
+                self._set_connected(True)
                 
                 # Perform secure handshake (client initiates)
                 if not self._perform_client_handshake():
                     logger.error("Secure handshake failed")
-                    self.connected = False
+                    self._set_connected(False)
                     self.peer_socket.close()
                     self.peer_socket = None
                     continue
@@ -333,19 +386,16 @@ class PeerConnection:
                 
                 if self.peer_socket is None and not self.connected:
                     # Configure socket for low-latency communication
-                    conn.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
-                    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-                    conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUF_SIZE)
-                    conn.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUF_SIZE)
+                    _configure_socket(conn)
                     
                     self.peer_socket = conn
                     self.peer_ip = addr[0]
-                    self.connected = True
+                    self._set_connected(True)
                     
                     # Perform secure handshake (server responds)
                     if not self._perform_server_handshake():
                         logger.error("Secure handshake failed")
-                        self.connected = False
+                        self._set_connected(False)
                         self.peer_socket.close()
                         self.peer_socket = None
                         continue
@@ -371,7 +421,10 @@ class PeerConnection:
     
     def _receiver_loop(self):
         """Receiver thread: continuously receive and process messages."""
-        buffer = ""
+        buffer = bytearray()
+        # Receive into one reused chunk instead of a new bytes object per recv
+        chunk = bytearray(BUFFER_SIZE)
+        view = memoryview(chunk)
         
         while not self.stop_event.is_set() and self.connected:
             try:
@@ -379,27 +432,35 @@ class PeerConnection:
                     break
                 
                 self.peer_socket.settimeout(1.0)
-                data = self.peer_socket.recv(BUFFER_SIZE)
+                n = self.peer_socket.recv_into(chunk)
                 
-                if not data:
+                if not n:
                     logger.warning("Peer disconnected")
-                    self.connected = False
+                    self._set_connected(False)
                     break
                 
-                buffer += data.decode('utf-8')
+                # Everything already buffered has no newline, so only scan the new bytes
+                scan_from = len(buffer)
+                buffer += view[:n]
                 
                 # Process complete messages (terminated by newline)
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    if line.strip():
-                        self._process_encrypted_message(line.strip())
+                start = 0
+                end = buffer.find(b'\n', scan_from)
+                while end >= 0:
+                    line = buffer[start:end].strip()
+                    if line:
+                        self._process_encrypted_message(line.decode('utf-8'))
+                    start = end + 1
+                    end = buffer.find(b'\n', start)
+                if start:
+                    del buffer[:start]
                         
             except socket.timeout:
                 continue
             except Exception as e:
                 if not self.stop_event.is_set():
                     logger.error("Receiver error: %s", e)
-                self.connected = False
+                self._set_connected(False)
                 break
     
     def _process_encrypted_message(self, encrypted_message: str):
@@ -417,13 +478,26 @@ class PeerConnection:
                 self.last_heartbeat = time.time()
                 return
             
-            handler = self.command_handlers.get(command)
-            if handler:
-                handler(data)
+            if command == 'BATCH':
+                # Several small commands coalesced by the sender, in send order
+                for message in data.get('commands', []):
+                    self._dispatch_command(message)
+                return
+            
+            self._dispatch_command(data)
                 
         except Exception as e:
             logger.error("Message processing error: %s", e)
     
+    def _dispatch_command(self, data: dict):
+        """Call the registered handler for a decrypted command message."""
+        handler = self.command_handlers.get(data.get('command'))
+        if handler:
+            try:
+                handler(data)
+            except Exception as e:
+                logger.error("Handler error for %s: %s", data.get('command'), e)
+    
     def _heartbeat_loop(self):
         """Heartbeat thread: periodically send keep-alive messages."""
         while not self.stop_event.is_set() and self.connected:
@@ -434,12 +508,12 @@ class PeerConnection:
                 # Check if peer is alive
                 if time.time() - self.last_heartbeat > HEARTBEAT_INTERVAL * 3:
                     logger.warning("Peer heartbeat timeout")
-                    self.connected = False
+                    self._set_connected(False)
                     break
                     
             except Exception:
                 if not self.stop_event.is_set():
-                    self.connected = False
+                    self._set_connected(False)
                 break
     
     def send_command(self, command: str, data: Dict[str, Any], large: bool = False) -> bool:
@@ -453,10 +527,66 @@ class PeerConnection:
         if not self.connected or self.peer_socket is None or not self.encryption_ready:
             return False
         
+        # Anything queued by send_command_batched goes out first to keep order.
+        # Both frames are written under the send lock, so no other sender (or
+        # the batch timer) can slip a frame in between.
+        with self._send_lock:
+            self._flush_batch_locked()
+            return self._send_message({'command': command, **data}, large)
+    
+    def send_command_batched(self, command: str, data: Dict[str, Any]) -> bool:
+        """Queue a small command; queued commands are sent together in one BATCH frame.
+        
+        The queue is flushed after BATCH_DELAY, when BATCH_MAX_COMMANDS are
+        waiting, or before the next regular send_command, so the peer sees
+        all commands in the order they were issued.
+        """
+        if not self.connected or self.peer_socket is None or not self.encryption_ready:
+            return False
+        
+        with self._batch_lock:
+            self._batch.append({'command': command, **data})
+            flush_now = len(self._batch) >= BATCH_MAX_COMMANDS
+            if not flush_now and self._batch_timer is None:
+                self._batch_timer = threading.Timer(BATCH_DELAY, self._flush_batch)
+                self._batch_timer.daemon = True
+                self._batch_timer.start()
+        
+        if flush_now:
+            self._flush_batch()
+        return True
+    
+    def _flush_batch(self):
+        """Send all queued batched commands as a single frame."""
+        with self._send_lock:
+            self._flush_batch_locked()
+    
+    def _flush_batch_locked(self):
+        """Take the queued batched commands and write them; caller holds _send_lock.
+        
+        Lock order is always _send_lock, then _batch_lock: taking the queue and
+        writing it is one step with respect to every other sender.
+        """
+        with self._batch_lock:
+            messages = list(self._batch)
+            self._batch.clear()
+            if self._batch_timer is not None:
+                self._batch_timer.cancel()
+                self._batch_timer = None
+        
+        if len(messages) == 1:
+            self._send_message(messages[0])
+        elif messages:
+            self._send_message({'command': 'BATCH', 'commands': messages})
+    
+    def _send_message(self, message: Dict[str, Any], large: bool = False) -> bool:
+        """Encrypt and write one message frame; caller holds _send_lock."""
+        if not self.connected or self.peer_socket is None or not self.encryption_ready:
+            return False
+        
         timeout = SEND_TIMEOUT_LARGE if large else SEND_TIMEOUT
         
         try:
-            message = {'command': command, **data}
             encrypted = self.secure_channel.encrypt_message(message)
             payload = (encrypted + '\n').encode('utf-8')
             
@@ -472,11 +602,11 @@ class PeerConnection:
                 self.peer_socket.settimeout(old_timeout)
                 
         except socket.timeout:
-            logger.error("Send command timeout after %.1fs for command: %s", timeout, command)
+            logger.error("Send command timeout after %.1fs for command: %s", timeout, message.get('command'))
             return False
         except Exception as e:
             logger.error("Send command error: %s", e)
-            self.connected = False
+            self._set_connected(False)
             return False
     
     def is_connected(self) -> bool:
@@ -490,7 +620,12 @@ class PeerConnection:
     def close(self):
         """Close all connections and stop threads."""
         self.stop_event.set()
-        self.connected = False
+        with self._batch_lock:
+            if self._batch_timer is not None:
+                self._batch_timer.cancel()
+                self._batch_timer = None
+            self._batch.clear()
+        self._set_connected(False)
         
         for sock in [self.peer_socket, self.client_socket, self.server_socket]:
             if sock: